@@ -61,9 +61,11 @@ TODOs:
 """
 
 import argparse
+import dataclasses
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from enum import StrEnum, auto
-from typing import Dict
+from typing import Dict, Optional, Tuple
 
 from requests.exceptions import HTTPError
 from util import charmhub, k8s, sqa
@@ -71,36 +73,54 @@ from util import charmhub, k8s, sqa
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
 
+# Maximum number of tracks processed concurrently. Processing a track is
+# dominated by waiting on Charmhub and SQA, so threads are sufficient.
+MAX_PARALLEL_TRACKS = 8
+# Maximum number of (arch, base) TPI status queries issued concurrently per track.
+MAX_PARALLEL_TPI_QUERIES = 6
+
 
 class TrackState:
     def __init__(self):
         self._state_map: Dict[str, sqa.TestPlanInstanceStatus] = {}
+        self._summary: Optional[Tuple[bool, bool, bool]] = None
 
     def set_state(self, version, state: sqa.TestPlanInstanceStatus):
         self._state_map[version] = state
+        self._summary = None
 
     def __str__(self):
         return str([(key, str(value)) for key, value in self._state_map.items()])
 
+    def _summarize(self) -> Tuple[bool, bool, bool]:
+        """Compute the (failed, succeeded, in_progress) flags in a single pass."""
+        if self._summary is None:
+            failed, succeeded, in_progress = False, not self.empty, False
+            for s in self._state_map.values():
+                if s.failed:
+                    # A failure overrides any other state of the track
+                    failed, succeeded, in_progress = True, False, False
+                    break
+                succeeded = succeeded and s.succeeded
+                in_progress = in_progress or s.in_progress
+            self._summary = (failed, succeeded, in_progress)
+        return self._summary
+
     @property
     def empty(self) -> bool:
         return not self._state_map
 
     @property
     def failed(self) -> bool:
-        return any(s.failed for s in self._state_map.values())
+        return self._summarize()[0]
 
     @property
     def succeeded(self) -> bool:
-        if self.empty:
-            return False
-        return all(s.succeeded for s in self._state_map.values())
+        return self._summarize()[1]
 
     @property
     def in_progress(self) -> bool:
-        if self.failed:
-            return False
-        return any(s.in_progress for s in self._state_map.values())
+        return self._summarize()[2]
 
 
 class ProcessState(StrEnum):
@@ -111,50 +131,93 @@ class ProcessState(StrEnum):
     PROCESS_UNCHANGED = auto()
 
 
+# Process states that are not reported in the results
+SKIP_STATES = frozenset(
+    {ProcessState.PROCESS_IN_PROGRESS, ProcessState.PROCESS_UNCHANGED}
+)
+
+# Process states that stop the remaining tracks when running with --fail-fast
+FAIL_STATES = frozenset({ProcessState.PROCESS_FAILED, ProcessState.PROCESS_CI_FAILED})
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class TrackContext:
+    """Channels of a track, formatted once when the track is processed."""
+
+    track: str
+    from_channel: str
+    to_channel: str
+
+    @classmethod
+    def from_args(cls, track: str, args) -> "TrackContext":
+        return cls(track, f"{track}/{args.from_risk}", f"{track}/{args.to_risk}")
+
+
 def ensure_track_state(
-    channel,
+    ctx: TrackContext,
     bundle: charmhub.Bundle,
     dry_run: bool,
     priority_generator: sqa.PriorityGenerator,
 ) -> TrackState:
     track_state = TrackState()
-    for arch in bundle.get_archs():
-        # Note(Reza): Currently SQA only supports the test for the amd64 architecture
-        # we should differentiate the TPIs for different architectures once arm64 is
-        # also supported. I have not put that in a file to avoid creating a perception
-        # that more than one architecture could be tested. Having more than one arch
-        # would break the pipeline by creating duplicates as there are no ways to
-        # distinguish test environments for architectures on SQA side.
-        if arch != "amd64":
-            continue
+    # Note(Reza): Currently SQA only supports the test for the amd64 architecture
+    # we should differentiate the TPIs for different architectures once arm64 is
+    # also supported. I have not put that in a file to avoid creating a perception
+    # that more than one architecture could be tested. Having more than one arch
+    # would break the pipeline by creating duplicates as there are no ways to
+    # distinguish test environments for architectures on SQA side.
+    archs = [arch for arch in bundle.get_archs() if arch == "amd64"]
+    bases = bundle.get_bases()
+    cells = [
+        (arch, base, version, priority_generator.next_priority)
+        for arch in archs
+        for base in bases
+        if (version := bundle.get_version(arch, base))
+    ]
+
+    def _current_status(cell):
+        arch, base, version, priority = cell
+        log.info(
+            "Checking if there is any TPIs for (%s, %s, %s, %s)",
+            ctx.from_channel,
+            arch,
+            base,
+            priority,
+        )
+        return sqa.current_test_plan_instance_status(ctx.from_channel, base, version)
+
+    # The status of each (arch, base) is independent of the others, so query
+    # them concurrently and reconcile the results in order afterwards.
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_TPI_QUERIES) as executor:
+        statuses = list(executor.map(_current_status, cells))
+
+    release_tests = []
+    for (arch, base, version, priority), current_test_plan_instance_status in zip(
+        cells, statuses
+    ):
+        if not current_test_plan_instance_status:
+            revisions = bundle.get_revisions(arch, base)
+            # We are creating TPIs with different priorities to avoid overloading the
+            # SQA platform
 
-        for base in bundle.get_bases():
-            version = bundle.get_version(arch, base)
-            if not version:
-                continue
-            priority = priority_generator.next_priority
             log.info(
-                f"Checking if there is any TPIs for ({channel}, {arch}, {base}, {priority})"
+                "No TPI found. Creating a new TPI for %s with priority %s",
+                revisions,
+                priority,
             )
-            current_test_plan_instance_status = sqa.current_test_plan_instance_status(
-                channel, base, version
-            )
-            if not current_test_plan_instance_status:
-                revisions = bundle.get_revisions(arch, base)
-                # We are creating TPIs with different priorities to avoid overloading the
-                # SQA platform
-
-                log.info(f"No TPI found. Creating a new TPI for {revisions} with priority {priority}")
 
-                if not dry_run:
-                    sqa.start_release_test(
-                        channel, base, arch, revisions, version, priority
-                    )
+            release_tests.append(
+                sqa.ReleaseTest(
+                    ctx.from_channel, base, arch, revisions, version, priority
+                )
+            )
+            track_state.set_state(version, sqa.TestPlanInstanceStatus.IN_PROGRESS)
+            continue
 
-                track_state.set_state(version, sqa.TestPlanInstanceStatus.IN_PROGRESS)
-                continue
+        track_state.set_state(version, current_test_plan_instance_status)
 
-            track_state.set_state(version, current_test_plan_instance_status)
+    if release_tests and not dry_run:
+        sqa.start_release_tests(release_tests)
 
     return track_state
 
@@ -164,34 +227,58 @@ def process_track(track: str, priority_generator: sqa.PriorityGenerator, args) -
 
     dry_run: bool = args.dry_run
     bundle_charms: list[str] = args.charms
-    from_channel = f"{track}/{args.from_risk}"
-    to_channel = f"{track}/{args.to_risk}"
+    ctx = TrackContext.from_args(track, args)
+    from_channel, to_channel = ctx.from_channel, ctx.to_channel
     k8s_operator_bundle = charmhub.Bundle("k8s-operator")
     at_least_one_charm = False
+
+    # Every (charm, channel) revision matrix is independent, fetch them all at once.
+    queries = [
+        (charm, channel)
+        for charm in bundle_charms
+        for channel in (from_channel, to_channel)
+    ]
+    log.info("Getting revisions for %s charms on track %s", bundle_charms, track)
+    with ThreadPoolExecutor(max_workers=max(len(queries), 1)) as executor:
+        revision_matrices = {
+            query: executor.submit(charmhub.get_revision_matrix, *query)
+            for query in queries
+        }
+
     for charm in bundle_charms:
-        log.info(f"Getting revisions for {charm} charm on track {track}")
         try:
-            from_revision_matrix = charmhub.get_revision_matrix(charm, from_channel)
+            from_revision_matrix = revision_matrices[(charm, from_channel)].result()
         except HTTPError:
-            log.exception(f"failed to get revision matrix for charm {charm} channel={from_channel}")
+            log.exception(
+                "failed to get revision matrix for charm %s channel=%s",
+                charm,
+                from_channel,
+            )
             return ProcessState.PROCESS_CI_FAILED
         log.info("Channel %s revisions:\n %s", from_channel, from_revision_matrix)
 
         try:
-            stable_revision_matrix = charmhub.get_revision_matrix(charm, to_channel)
+            stable_revision_matrix = revision_matrices[(charm, to_channel)].result()
         except HTTPError:
-            log.exception(f"failed to get revision matrix for charm {charm} channel={to_channel}")
+            log.exception(
+                "failed to get revision matrix for charm %s channel=%s",
+                charm,
+                to_channel,
+            )
             return ProcessState.PROCESS_CI_FAILED
         log.info("Channel %s revisions:\n %s", to_channel, stable_revision_matrix)
 
         if not from_revision_matrix:
-            log.info(f"The channel {from_channel} of {charm} has no revisions.")
+            log.info("The channel %s of %s has no revisions.", from_channel, charm)
             k8s_operator_bundle.set(charm, stable_revision_matrix)
             continue
 
         if from_revision_matrix == stable_revision_matrix:
             log.info(
-                f"The channel {from_channel} of {charm} is already published in {to_channel}."
+                "The channel %s of %s is already published in %s.",
+                from_channel,
+                charm,
+                to_channel,
             )
             k8s_operator_bundle.set(charm, stable_revision_matrix)
             continue
@@ -199,46 +286,51 @@ def process_track(track: str, priority_generator: sqa.PriorityGenerator, args) -
         k8s_operator_bundle.set(charm, from_revision_matrix)
 
     if not k8s_operator_bundle.is_testable():
-        log.info(f"k8s is missing a charm in channel={from_channel}. Skipping...")
+        log.info("k8s is missing a charm in channel=%s. Skipping...", from_channel)
         return ProcessState.PROCESS_UNCHANGED
 
     if not at_least_one_charm:
-        log.info(f"Charm has no revisions in channel={from_channel}. Skipping...")
+        log.info("Charm has no revisions in channel=%s. Skipping...", from_channel)
         return ProcessState.PROCESS_UNCHANGED
 
     try:
         state = ensure_track_state(
-            from_channel, k8s_operator_bundle, dry_run, priority_generator
+            ctx, k8s_operator_bundle, dry_run, priority_generator
         )
-        log.info(f"Track {track} is in state: {state}")
+        log.info("Track %s is in state: %s", track, state)
 
         if state.empty:
             log.info("Track state is empty and indicative of a CI failure. Skipping...")
             return ProcessState.PROCESS_CI_FAILED
         elif state.succeeded:
-            log.info(f"Release run for {track} succeeded. Promoting charm revisions...")
+            log.info(
+                "Release run for %s succeeded. Promoting charm revisions...", track
+            )
             if not dry_run:
                 for charm in bundle_charms:
                     charmhub.promote_charm(charm, from_channel, to_channel)
             return ProcessState.PROCESS_SUCCESS
         elif state.in_progress:
-            log.info(f"Release run for {track} is still in progress. No action needed.")
+            log.info(
+                "Release run for %s is still in progress. No action needed.", track
+            )
             return ProcessState.PROCESS_IN_PROGRESS
         elif state.failed:
-            log.info(f"Release run for {track} failed. Manual intervention required.")
+            log.info("Release run for %s failed. Manual intervention required.", track)
             return ProcessState.PROCESS_FAILED
         else:
-            log.info(f"Unknown state for {track}. Skipping...")
+            log.info("Unknown state for %s. Skipping...", track)
             return ProcessState.PROCESS_CI_FAILED
     except sqa.SQAFailure:
-        log.exception(f"process track {track} failed because of the SQA")
+        log.exception("process track %s failed because of the SQA", track)
         return ProcessState.PROCESS_CI_FAILED
     except charmhub.CharmcraftFailure:
-        log.exception(f"process track {track} failed because of the Charmcraft")
+        log.exception("process track %s failed because of the Charmcraft", track)
         return ProcessState.PROCESS_CI_FAILED
     except sqa.InvalidSQAInput:
         log.exception(
-            f"process track {track} failed because of revision could not be extracted from version"
+            "process track %s failed because of revision could not be extracted from version",
+            track,
         )
         return ProcessState.PROCESS_CI_FAILED
 
@@ -261,6 +353,10 @@ def main():
         "--to-risk", default="stable",
         help="Target risk level for the charm release process (default: stable)"
     )
+    parser.add_argument(
+        "--fail-fast", action="store_true", required=False,
+        help="Stop processing the remaining tracks once a track fails"
+    )
     group = parser.add_mutually_exclusive_group(required=False)
     group.add_argument(
         "--supported-tracks", nargs="+", default=[], help="List of tracks to check for"
@@ -272,29 +368,45 @@ def main():
     if args.supported_tracks:
         tracks = args.supported_tracks
     else:
-        log.info(f"Getting all Kubernetes releases after {args.after} inclusive.")
+        log.info("Getting all Kubernetes releases after %s inclusive.", args.after)
         tracks = k8s.get_all_releases_after(args.after)
 
     if not tracks:
         log.info("No tracks found for charm release process. Skipping...")
         return
 
-    log.info(f"Starting the charms {args.charms} release process for: {tracks}")
+    log.info("Starting the charms %s release process for: %s", args.charms, tracks)
 
-    results = {}
     priority_generator = sqa.PriorityGenerator(initial=5)
+    tracks = list(tracks)
+    process_states = {}
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_TRACKS) as executor:
+        futures = {
+            executor.submit(process_track, track, priority_generator, args): track
+            for track in tracks
+        }
+        for future in as_completed(futures):
+            track = futures[future]
+            process_states[track] = future.result()
+            if args.fail_fast and process_states[track] in FAIL_STATES:
+                log.info("Track %s failed, cancelling the pending tracks", track)
+                for pending in futures:
+                    pending.cancel()
+                break
+    # Tracks already running when cancelling still finish, report them as well.
+    for future, track in futures.items():
+        if track not in process_states and future.done() and not future.cancelled():
+            process_states[track] = future.result()
+
+    results = {}
     for track in tracks:
-        process_state = process_track(track, priority_generator, args)
-        if process_state in [
-            ProcessState.PROCESS_IN_PROGRESS,
-            ProcessState.PROCESS_UNCHANGED,
-        ]:
+        process_state = process_states.get(track)
+        if process_state is None or process_state in SKIP_STATES:
             continue
         results[track] = str(process_state)
 
     with open("results.txt", "w") as f:
-        for key, value in results.items():
-            f.write(f"{key}={value}\n")
+        f.write("".join(f"{key}={value}\n" for key, value in results.items()))
 
 
 if __name__ == "__main__":
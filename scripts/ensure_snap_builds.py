@@ -3,24 +3,29 @@
 import argparse
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import NamedTuple
 
+import requests
 import semver
 import util.lp as lp
 import util.repo as repo
 import util.snapstore as snapstore
 import util.util as util
 from lazr.restfulclient.errors import NotFound
+from lazr.restfulclient.resource import Entry
 
 USAGE = f"./{Path(__file__).name} [options]"
 
 DESCRIPTION = """Ensure snap channels and LP recipes for the specified branch."""
 
+# Maximum number of branches cloned, or snap tracks ensured, concurrently.
+MAX_WORKERS = 8
 
-def ensure_snap_channels(
-    flavour: str, ver: semver.Version, tip: bool, dry_run: bool
-) -> list[str]:
-    """Ensure snap channels for the specified version."""
+
+def snap_channels(flavour: str, ver: semver.Version, tip: bool) -> list[str]:
+    """Return the snap channels for the specified version."""
     channels = []
     if tip:
         channels += [f"latest/edge/{flavour}"]
@@ -37,23 +42,71 @@ def ensure_snap_channels(
             # promotion workflow.
             track = "edge"
         channels += [f"{name}/{track}"]
+    return channels
+
 
+def ensure_snap_tracks(channels: list[str], ver: semver.Version, dry_run: bool) -> None:
+    """Ensure the snap tracks of the channels exist in the snapstore."""
     # Only the tracks (e.g. 1.33-classic) need to be created in the snapstore.
     # The channels (e.g. latest/edge/classic) will be opened automatically.
     # Ensure each track is tested only once.
-    unique_tracks = {channel.split("/")[0] for channel in channels}
+    unique_tracks = sorted({channel.split("/")[0] for channel in channels})
     LOG.info(
         "Ensure snap tracks %s for ver %s in snapstore", ",".join(unique_tracks), ver
     )
-    for track in unique_tracks:
-        if not dry_run:
-            snapstore.ensure_track(util.SNAP_NAME, track)
+    if dry_run:
+        return
+
+    # Each track is a separate snapstore request, ensure them concurrently.
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        list(
+            executor.map(
+                lambda track: snapstore.ensure_track(util.SNAP_NAME, track),
+                unique_tracks,
+            )
+        )
+
+
+class RecipeTargets(NamedTuple):
+    """Launchpad entries shared by the recipes of every branch and flavour."""
+
+    project: Entry
+    owner: Entry
+    repo: Entry
+    archive: Entry
+    snappy_series: Entry
 
-    return channels
+
+def recipe_targets() -> RecipeTargets:
+    """Look up the Launchpad entries the LP recipes are built against."""
+    client = lp.client()
+    return RecipeTargets(
+        project=lp.project(util.SNAP_NAME),
+        owner=lp.person(lp.OWNER),
+        repo=lp.default_repo(util.SNAP_NAME),
+        archive=client.archives.getByReference(reference="ubuntu"),
+        snappy_series=client.snappy_serieses.getByName(name="16"),
+    )
+
+
+def _recipe_value(recipe, key: str, value) -> tuple:
+    """Return the recipe and manifest values to compare for the given key.
+
+    Linked entries are compared by their links, comparing Entry objects would
+    fetch each linked resource from Launchpad only to read its etag.
+    """
+    if isinstance(value, Entry):
+        return getattr(recipe, f"{key}_link"), value.self_link
+    return getattr(recipe, key), value
 
 
 def ensure_lp_recipe(
-    flavour: str, ver: semver.Version, channels: list[str], tip: bool, dry_run: bool
+    flavour: str,
+    ver: semver.Version,
+    channels: list[str],
+    tip: bool,
+    dry_run: bool,
+    targets: RecipeTargets,
 ) -> str:
     """Confirm LP Snap Recipe settings.
 
@@ -101,22 +154,17 @@ def ensure_lp_recipe(
         ",".join(channels),
     )
     client = lp.client()
-    lp_project = client.projects[util.SNAP_NAME]
-    lp_owner = client.people[lp.OWNER]
-    lp_repo = client.git_repositories.getDefaultRepository(target=lp_project)
-    lp_ref = lp_repo.getRefByPath(path=flavor_branch)
-    lp_archive = client.archives.getByReference(reference="ubuntu")
-    lp_snappy_series = client.snappy_serieses.getByName(name="16")
+    lp_ref = targets.repo.getRefByPath(path=flavor_branch)
     manifest = dict(
         auto_build=auto_build,
-        auto_build_archive=lp_archive,
+        auto_build_archive=targets.archive,
         auto_build_pocket="Updates",
         auto_build_channels={"snapcraft": "8.x/stable"},
         description=f"Recipe for {util.SNAP_NAME} {flavor_branch}",
         git_ref=lp_ref,
         information_type="Public",
         name=recipe_name,
-        owner=lp_owner,
+        owner=targets.owner,
         processors=[
             "/+processors/amd64",
             "/+processors/arm64",
@@ -124,10 +172,10 @@ def ensure_lp_recipe(
         store_channels=channels,
         store_name=util.SNAP_NAME,
         store_upload=True,
-        store_series=lp_snappy_series,
+        store_series=targets.snappy_series,
     )
     try:
-        recipe = client.snaps.getByName(name=recipe_name, owner=lp_owner)
+        recipe = client.snaps.getByName(name=recipe_name, owner=targets.owner)
     except NotFound:
         recipe = None
 
@@ -136,7 +184,7 @@ def ensure_lp_recipe(
         params = dict(**manifest)
         params.pop("auto_build_channels")
         LOG.info("Recipe manifest: %s", params)
-        recipe = (not dry_run) and client.snaps.new(project=lp_project, **params)
+        recipe = (not dry_run) and client.snaps.new(project=targets.project, **params)
 
     if recipe:
         LOG.info(" Confirming LP recipe %s", recipe_name)
@@ -151,11 +199,11 @@ def ensure_lp_recipe(
             (not dry_run) and recipe.setProcessors(processors=processors)
 
         for key, value in manifest.items():
-            lp_value = getattr(recipe, key)
-            diff = lp_value != value
+            lp_value, expected = _recipe_value(recipe, key, value)
+            diff = lp_value != expected
             updated |= {key} if diff else set()
             if diff:
-                LOG.info("  Update %s: %s -> %s", key, lp_value, value)
+                LOG.info("  Update %s: %s -> %s", key, lp_value, expected)
                 if not dry_run:
                     setattr(recipe, key, value)
 
@@ -165,7 +213,39 @@ def ensure_lp_recipe(
     return recipe_name
 
 
-def prepare_track_builds(branch: str, args: argparse.Namespace):
+def read_branch(branch: str) -> tuple[semver.Version, list[str]]:
+    """Read the Kubernetes version and the snap flavours of a k8s-snap branch.
+
+    GitHub remotes are read over HTTP, other remotes or failed requests fall
+    back to cloning the branch.
+    """
+    version_path = "build-scripts/components/kubernetes/version"
+    if repo.github_repo(util.SNAP_REPO):
+        try:
+            branch_ver = repo.read_file_at(util.SNAP_REPO, branch, version_path)
+            patches = repo.list_dir_at(util.SNAP_REPO, branch, str(util.PATCH_DIR))
+        except (requests.RequestException, ValueError):
+            LOG.warning("Failed to read %s over HTTP, cloning it", branch)
+        else:
+            branch_ver = branch_ver.strip()
+            LOG.info("Current version detected %s on %s", branch_ver, branch)
+            flavors = util.flavors_from_patches(patches)
+            return semver.Version.parse(branch_ver.strip("v")), flavors
+
+    sparse = ["build-scripts/components/kubernetes"]
+    with repo.clone(util.SNAP_REPO, branch, sparse=sparse) as dir:
+        branch_ver = (dir / version_path).read_text().strip()
+        LOG.info("Current version detected %s on %s", branch_ver, branch)
+        return semver.Version.parse(branch_ver.strip("v")), util.flavors(dir)
+
+
+def prepare_track_builds(
+    branch: str,
+    ver: semver.Version,
+    flavors: list[str],
+    args: argparse.Namespace,
+    targets: RecipeTargets,
+):
     """Prepares all flavour branches to be built.
 
     * Ensure snap channels are available in the snapstore.
@@ -173,23 +253,27 @@ def prepare_track_builds(branch: str, args: argparse.Namespace):
     * Ensure LP recipes are building from correct branches.
     * Ensure LP recipes are pushing to the correct snap channels.
     """
-    with repo.clone(util.SNAP_REPO, branch) as dir:
-        version_file = dir / "build-scripts/components/kubernetes/version"
-        branch_ver = version_file.read_text().strip()
-        ver = semver.Version.parse(branch_ver.strip("v"))
-        flavors = util.flavors(dir)
-
-        LOG.info("Current version detected %s", branch_ver)
-        tip = branch == "main"
-        for flavour in flavors:
-            if ver.prerelease and flavour != "classic":
-                LOG.info(
-                    f"Ignoring pre-release flavour: {flavour}, only 'classic' "
-                    "pre-releases are supported."
-                )
-                continue
-            channels = ensure_snap_channels(flavour, ver, tip, args.dry_run)
-            ensure_lp_recipe(flavour, ver, channels, tip, args.dry_run)
+    tip = branch == "main"
+    supported = []
+    for flavour in flavors:
+        if ver.prerelease and flavour != "classic":
+            LOG.info(
+                "Ignoring pre-release flavour: %s, only 'classic' "
+                "pre-releases are supported.",
+                flavour,
+            )
+            continue
+        supported.append(flavour)
+
+    # Flavours can share a track (e.g. latest on main), ensure each one once
+    # for the whole branch before confirming the recipes.
+    flavour_channels = [snap_channels(flavour, ver, tip) for flavour in supported]
+    ensure_snap_tracks(sum(flavour_channels, []), ver, args.dry_run)
+
+    # The LP recipes share a single launchpadlib client which is not safe to
+    # use from threads, confirm them one at a time.
+    for flavour, channels in zip(supported, flavour_channels):
+        ensure_lp_recipe(flavour, ver, channels, tip, args.dry_run, targets)
 
 
 def main():
@@ -202,22 +286,39 @@ def main():
     args = util.setup_arguments(arg_parser)
     branches = args.branches
 
+    # List the remote branches once rather than querying the remote per branch.
+    all_branches = list(repo.ls_branches(util.SNAP_REPO))
     if not branches:
-        all_branches = repo.ls_branches(util.SNAP_REPO)
-        branches = [b for b in all_branches if util.TIP_BRANCH.match(b)]
-        LOG.info("No branches specified, checking '%s'", ", ".join(branches))
-    for branch in branches:
-        if not repo.is_branch(util.SNAP_REPO, branch):
-            LOG.error("Branch %s does not exist", branch)
-            continue
-        if not util.TIP_BRANCH.match(branch):
-            LOG.warning(
-                "Skipping branch '%s' - not a supported branch r/%s/",
-                branch,
-                util.TIP_BRANCH.pattern,
-            )
-            continue
-        prepare_track_builds(branch, args)
+        supported_branches = [b for b in all_branches if util.TIP_BRANCH.match(b)]
+        LOG.info(
+            "No branches specified, checking '%s'", ", ".join(supported_branches)
+        )
+    else:
+        existing_branches = set(all_branches)
+        supported_branches = []
+        for branch in branches:
+            if branch not in existing_branches:
+                LOG.error("Branch %s does not exist", branch)
+                continue
+            if not util.TIP_BRANCH.match(branch):
+                LOG.warning(
+                    "Skipping branch '%s' - not a supported branch r/%s/",
+                    branch,
+                    util.TIP_BRANCH.pattern,
+                )
+                continue
+            supported_branches.append(branch)
+
+    if not supported_branches:
+        return
+
+    # Cloning dominates the run time, so read all the branches at once.
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        branch_details = list(executor.map(read_branch, supported_branches))
+    # The Launchpad lookups below are the same for every branch and flavour.
+    targets = recipe_targets()
+    for branch, (ver, flavors) in zip(supported_branches, branch_details):
+        prepare_track_builds(branch, ver, flavors, args, targets)
 
 
 is_main = __name__ == "__main__"
@@ -10,6 +10,10 @@ from packaging.version import Version
 
 LOG = logging.getLogger(__name__)
 
+PRERELEASE_RE = re.compile(r"^v\d+\.\d+\.\d+-(?:alpha|beta|rc)\.\d+$")
+# Matches the pre-release number, e.g. ".0" in "-alpha.0"
+PRERELEASE_NUMBER_RE = re.compile(r"(-[a-zA-Z]+)\.[0-9]+")
+
 
 def get_outstanding_prereleases(as_git_branch: bool = False) -> List[str]:
     """Return outstanding K8s pre-releases.
@@ -53,14 +57,13 @@ def get_obsolete_prereleases() -> List[str]:
 
 def get_prerelease_git_branch(prerelease: str):
     """Retrieve the name of the k8s-snap git branch for a given k8s pre-release."""
-    prerelease_re = r"v\d+\.\d+\.\d-(?:alpha|beta|rc)\.\d+"
-    if not re.match(prerelease_re, prerelease):
+    if not PRERELEASE_RE.match(prerelease):
         raise ValueError("Unexpected k8s pre-release name: %s", prerelease)
 
     # Use a single branch for all pre-releases of a given risk level,
     # e.g. v1.33.0-alpha.0 -> autoupdate/v1.33.0-alpha
     branch = f"autoupdate/{prerelease}"
-    return re.sub(r"(-[a-zA-Z]+)\.[0-9]+", r"\1", branch)
+    return PRERELEASE_NUMBER_RE.sub(r"\1", branch)
 
 
 if __name__ == "__main__":
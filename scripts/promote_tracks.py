@@ -10,7 +10,7 @@ import re
 import subprocess
 import sys
 from collections import defaultdict
-from functools import cached_property
+from functools import cache
 from pathlib import Path
 from typing import Optional
 
@@ -39,7 +39,8 @@ IGNORE_TRACKS = ["latest"]
 
 # The snap risk levels, used to find the next risk level for a revision.
 RISK_LEVELS = ["edge", "beta", "candidate", "stable"]
-NEXT_RISK = RISK_LEVELS[1:] + [None]
+RISK_INDEX = {risk: idx for idx, risk in enumerate(RISK_LEVELS)}
+NEXT_RISK = dict(zip(RISK_LEVELS, RISK_LEVELS[1:] + [None]))
 
 # Revisions stay at a certain risk level for some days before being promoted.
 DAYS_TO_STAY_IN_EDGE = 1
@@ -52,13 +53,22 @@ TOX_PATH = (venv := os.getenv("VIRTUAL_ENV")) and Path(venv) / "bin/tox" or "tox
 TRACK_RE = re.compile(r"^(\d+)\.(\d+)(\S*)$")
 
 
+# Turns the hyphenated snapstore keys into valid field names
+HYPHEN_TO_UNDERSCORE = str.maketrans("-", "_")
+
+
 class Hyphenized:
+    __slots__ = ()
+
     @classmethod
     def bake(cls, *args, **kwargs):
-        return cls(*args, **{s.replace("-", "_").lower(): v for s, v in kwargs.items()})
+        return cls(
+            *args,
+            **{k.translate(HYPHEN_TO_UNDERSCORE).lower(): v for k, v in kwargs.items()},
+        )
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True, slots=True)
 class ChannelMetadata(Hyphenized):
     name: Optional[str] = None
     track: Optional[str] = None
@@ -67,7 +77,7 @@ class ChannelMetadata(Hyphenized):
     released_at: Optional[str] = None
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True, slots=True)
 class Channel(Hyphenized):
     channel: ChannelMetadata
     created_at: Optional[str] = None
@@ -75,18 +85,55 @@ class Channel(Hyphenized):
     version: Optional[str] = None
     type: Optional[str] = None
     download: Optional[dict] = dataclasses.field(default_factory=dict)
+    # Derived from the risk once, when the channel is baked
+    next_risk: Optional[str] = dataclasses.field(init=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "next_risk", NEXT_RISK.get(self.channel.risk))
 
-    @cached_property
-    def next_risk(self):
-        return NEXT_RISK[RISK_LEVELS.index(self.risk)]
+    @property
+    def name(self):
+        return self.channel.name
 
-    def __getattr__(self, name):
-        return getattr(self.channel, name)
+    @property
+    def track(self):
+        return self.channel.track
+
+    @property
+    def risk(self):
+        return self.channel.risk
+
+    @property
+    def architecture(self):
+        return self.channel.architecture
+
+    @property
+    def released_at(self):
+        return self.channel.released_at
 
 
 EMPTY_CHANNEL = Channel(channel=ChannelMetadata())
 
 
+@cache
+def _prior_track(track: str) -> str:
+    """Return the track of the previous minor release, e.g. 1.31-classic."""
+    if match := TRACK_RE.match(track):
+        maj, min, tail = match.groups()
+    else:
+        raise ValueError(f"Invalid track name: {track}")
+    return f"{maj}.{int(min) - 1}{tail}"
+
+
+def _highest_channel(
+    track: str, risks: list[str], channels: dict[str, Channel]
+) -> Optional[str]:
+    """Return the existing channel of the track with the highest of the risks."""
+    return next(
+        (name for r in reversed(risks) if (name := f"{track}/{r}") in channels), None
+    )
+
+
 def _build_upgrade_channels(
     channel: Channel, channels: dict[str, Channel]
 ) -> list[list[str]]:
@@ -113,45 +160,30 @@ def _build_upgrade_channels(
     track = channel.track
     next_risk = channel.next_risk
 
-    # The next risk on this track
+    # Candidates in priority order, each one is either a channel name or None
     next_channel = f"{track}/{next_risk}"
-    source_channels = set()
-    if next_channel in channels:
-        source_channels |= {next_channel}
-
-    # First highest risk on this track (excluding next-risk)
-    same_track_channels = [
-        f"{track}/{r}"
-        for idx, r in enumerate(RISK_LEVELS)
-        if idx > RISK_LEVELS.index(next_risk)
-    ]
-    for source in reversed(same_track_channels):
-        if source in channels:
-            source_channels |= {source}
-            break
-
-    # First highest risk on the previous track
-    if match := TRACK_RE.match(track):
-        maj, min, tail = match.groups()
-    else:
-        raise ValueError(f"Invalid track name: {track}")
-    prior_track = f"{maj}.{int(min) - 1}{tail}"
-    prior_track_channels = [f"{prior_track}/{r}" for r in RISK_LEVELS]
-    for source in reversed(prior_track_channels):
-        if source in channels:
-            source_channels |= {source}
-            break
+    candidates = (
+        # The next risk on this track
+        next_channel if next_channel in channels else None,
+        # First highest risk on this track (excluding next-risk)
+        _highest_channel(track, RISK_LEVELS[RISK_INDEX[next_risk] + 1 :], channels),
+        # First highest risk on the previous track
+        _highest_channel(_prior_track(track), RISK_LEVELS, channels),
+    )
+    source_channels = [source for source in candidates if source]
 
     if not source_channels:
         LOG.info("Without anything to upgrade from, just bootstrap on %s", channel.name)
         return [[channel.name]]
 
-    # Only run tests on revision changes
-    return [
-        [source, channel.name]
-        for source in sorted(source_channels)
-        if channel.revision != channels[source].revision
-    ]
+    # Only run tests on revision changes, once per source revision
+    upgrade_channels = []
+    seen_revisions = {channel.revision}
+    for source in source_channels:
+        if (revision := channels[source].revision) not in seen_revisions:
+            seen_revisions.add(revision)
+            upgrade_channels.append([source, channel.name])
+    return upgrade_channels
 
 
 def _create_channel_map():
@@ -182,6 +214,10 @@ def _create_arch_proposals(arch, channels: dict[str, Channel], args):
     proposals = []
     ignored_tracks = IGNORE_TRACKS + getattr(args, "ignore_tracks", [])
     ignored_arches = getattr(args, "ignore_arches", [])
+    if arch in ignored_arches:
+        LOG.debug("Skipping ignored architecture %s", arch)
+        return proposals
+
     days_to_stay_in_risk = {
         "edge": args.days_in_edge_risk,
         "beta": args.days_in_beta_risk,
@@ -189,41 +225,49 @@ def _create_arch_proposals(arch, channels: dict[str, Channel], args):
     }
 
     def sorter(info: Channel):
-        return (info.name, RISK_LEVELS.index(info.risk))
+        return (info.name, RISK_INDEX[info.risk])
 
-    latest_upstream_stable = k8s.get_latest_stable()
-    for channel_info in sorted(channels.values(), key=sorter, reverse=True):
-        track = channel_info.channel.track
-        risk = channel_info.risk
-        next_risk = channel_info.next_risk
-        revision = channel_info.revision
-        chan_log = logging.getLogger(f"{logger_name} {track:>15}/{risk:<9}")
+    # Drop the channels which are never promoted before sorting the rest
+    candidates = []
+    for info in channels.values():
+        track = info.track or ""
+        chan_log = logging.getLogger(f"{logger_name} {track:>15}/{info.risk:<9}")
 
         if not track:
             chan_log.debug("Skipping trackless channel")
             continue
 
-        if not next_risk:
+        if not info.next_risk:
             chan_log.debug("Skipping promoting stable")
             continue
 
         matched_pattern = next(
-            (pattern for pattern in ignored_tracks if re.fullmatch(pattern, track)),
-            None,
+            (p for p in ignored_tracks if re.fullmatch(p, track)), None
         )
         if matched_pattern:
             chan_log.debug(
-                f"Skipping ignored track '{track}' (matched pattern: '{matched_pattern}')"
+                f"Skipping ignored track '{track}' "
+                f"(matched pattern: '{matched_pattern}')"
             )
             continue
+        candidates.append(info)
 
-        if arch in ignored_arches:
-            chan_log.debug("Skipping ignored architecture")
-            continue
-
-        now = datetime.datetime.now(datetime.timezone.utc)
+    # Tracks with a revision released to stable on this architecture
+    stable_tracks = {
+        info.track
+        for info in channels.values()
+        if info.risk == "stable" and info.revision
+    }
+    latest_upstream_stable = k8s.get_latest_stable()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    for channel_info in sorted(candidates, key=sorter, reverse=True):
+        track = channel_info.track
+        risk = channel_info.risk
+        next_risk = channel_info.next_risk
+        revision = channel_info.revision
+        chan_log = logging.getLogger(f"{logger_name} {track:>15}/{risk:<9}")
 
-        if released_at := channel_info.channel.released_at:
+        if released_at := channel_info.released_at:
             released_at_date = datetime.datetime.fromisoformat(released_at)
         else:
             released_at_date = None
@@ -235,20 +279,17 @@ def _create_arch_proposals(arch, channels: dict[str, Channel], args):
             released_at_date,
         )
 
+        # channel_info is the "{track}/{risk}" entry of the channels
+        next_channel = channels.get(f"{track}/{next_risk}", EMPTY_CHANNEL)
         purgatory_complete = (
             released_at_date
             and (now - released_at_date).days >= days_to_stay_in_risk[risk]
-            and channels.get(f"{track}/{risk}", EMPTY_CHANNEL).revision
-            != channels.get(f"{track}/{next_risk}", EMPTY_CHANNEL).revision
+            and channel_info.revision != next_channel.revision
         )
         new_patch_in_edge = (
-            risk == "edge"
-            and channels.get(f"{track}/{next_risk}", EMPTY_CHANNEL).version
-            != channels.get(f"{track}/{risk}", EMPTY_CHANNEL).version
-        )
-        revision_in_stable = bool(
-            channels.get(f"{track}/stable", EMPTY_CHANNEL).revision
+            risk == "edge" and next_channel.version != channel_info.version
         )
+        revision_in_stable = track in stable_tracks
 
         def _get_proposal(next_risk):
             final_channel = f"{track}/{next_risk}"
@@ -312,24 +353,29 @@ def _create_arch_proposals(arch, channels: dict[str, Channel], args):
 
 def release_revision(args):
     # Note: we cannot use `snapcraft promote` here because it does not allow to promote from edge to beta without manual confirmation.
-    revision, channel = args.snap_revision, args.snap_channel
+    # All the channels are released at once, snapcraft accepts a comma-separated list.
+    revision, channels = args.snap_revision, ",".join(args.snap_channel)
     LOG.info(
-        "Promote r%s to %s%s", revision, channel, args.dry_run and " (dry-run)" or ""
+        "Promote r%s to %s%s", revision, channels, args.dry_run and " (dry-run)" or ""
     )
     args.dry_run or subprocess.run(
-        ["/snap/bin/snapcraft", "release", util.SNAP_NAME, revision, channel],
+        ["/snap/bin/snapcraft", "release", util.SNAP_NAME, revision, channels],
         check=True,
     )
 
 
 def execute_proposal_test(args):
     cmd = f"{TOX_PATH} -e integration -- -k test_version_upgrades"
+    test_path = "tests/integration/tests/test_version_upgrades.py"
+
+    # Only check out the whole branch when there are tests to run
+    if not repo.has_path(util.SNAP_REPO, args.branch, test_path):
+        LOG.info("No upgrade tests found on %s", args.branch)
+        return
 
     with repo.clone(util.SNAP_REPO, args.branch) as dir:
-        if repo.ls_tree(dir, "tests/integration/tests/test_version_upgrades.py"):
-            LOG.info("Running integration tests for %s", args.branch)
-            subprocess.run(cmd.split(), cwd=dir / "tests/integration", check=True)
-            return
+        LOG.info("Running integration tests for %s", args.branch)
+        subprocess.run(cmd.split(), cwd=dir / "tests/integration", check=True)
 
 
 def main():
@@ -395,7 +441,8 @@ def main():
     promote_args.add_argument(
         "--snap-channel",
         required=True,
-        help="The snap channel to promote to",
+        nargs="+",
+        help="The snap channels to promote to",
         dest="snap_channel",
     )
     promote_args.set_defaults(func=release_revision)
@@ -3,20 +3,49 @@
 import argparse
 import logging
 import os
+import platform
+import shutil
 import subprocess
+import tarfile
 import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from functools import cache, cached_property
 from pathlib import Path
 from typing import Union
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+import requests
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    Template,
+    select_autoescape,
+)
 from packaging.version import InvalidVersion, Version
 from pydantic import BaseModel, SecretStr
-from util.repo import clone
-from util.util import execute, setup_arguments
+from util.repo import clone, read_file_at
+from util.util import execute_streamed, setup_arguments
 
 LOG = logging.getLogger(__name__)
 
+K8S_REPO = "https://github.com/kubernetes/kubernetes.git"
+
+# Timeout in seconds to connect to, and between reads from, the Go downloads
+DOWNLOAD_TIMEOUT = 60
+
+# Templates rendered into the Debian package, loaded once per process.
+# rules.j2 and source_*.j2 have no variables and are copied verbatim.
+TEMPLATES = (
+    "changelog.j2",
+    "control.j2",
+    "copyright.j2",
+    "README.j2",
+    "Makefile.j2",
+    "devscripts.j2",
+)
+
 PRE_TO_RISK = {
     "a": "alpha",
     "b": "beta",
@@ -24,14 +53,39 @@ PRE_TO_RISK = {
 }
 
 
+# Compiled templates are kept across runs, the CI workflow caches this directory
+JINJA_CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "k8s-release-ci"
+    / "jinja"
+)
+
+# NOTE(Hue): We need to start the path with `scripts` because
+# the script is executed from the root of the repo.
+TEMPLATES_DIR = Path("scripts/templates/publish_k8s_debs/")
+
+JINJA_ENV = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(),
+    # The templates do not change while the script runs, skip the re-stat
+    auto_reload=False,
+    bytecode_cache=FileSystemBytecodeCache(str(JINJA_CACHE_DIR)),
+)
+
+
+@cache
+def _load_templates() -> dict[str, Template]:
+    """Load and compile the Debian package templates once per process."""
+    JINJA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return {name: JINJA_ENV.get_template(name) for name in TEMPLATES}
+
+
+@cache
 def _get_ubuntu_codename() -> str:
     """Get the Ubuntu codename from /etc/os-release."""
-    os_release_path = Path("/etc/os-release")
-    with open(os_release_path, "r") as f:
-        for line in f:
-            if line.startswith("VERSION_CODENAME="):
-                return line.strip().split("=")[1].strip('"')
-    raise RuntimeError(f"Unable to find VERSION_CODENAME in {os_release_path}")
+    if codename := platform.freedesktop_os_release().get("VERSION_CODENAME"):
+        return codename
+    raise RuntimeError("Unable to find VERSION_CODENAME in /etc/os-release")
 
 
 class Credentials(BaseModel):
@@ -91,12 +145,7 @@ class K8sDebManager:
                     Stable PPA:  canonical-kubernetes/v1.33
                     Test PPA:    canonical-kubernetes/v1.33-test
         """
-        self._jinja_env = Environment(
-            # NOTE(Hue): We need to start the path with `scripts` because
-            # the script is executed from the root of the repo.
-            loader=FileSystemLoader("scripts/templates/publish_k8s_debs/"),
-            autoescape=select_autoescape(),
-        )
+        self._templates = _load_templates()
 
         self._repo_tag = repo_tag
         self._component = component
@@ -108,19 +157,15 @@ class K8sDebManager:
         self._debs_lp_account = creds.debs_lp_account
         self._stable_ppa = stable_ppa
 
-    @property
+    @cached_property
     def _debian_dir(self) -> Path:
-        debian_dir = self._repo_dir / "debian"
-        os.makedirs(debian_dir, exist_ok=True)
-        return debian_dir
+        return self._repo_dir / "debian"
 
-    @property
+    @cached_property
     def _source_dir(self) -> Path:
-        source_dir = self._debian_dir / "source"
-        os.makedirs(source_dir, exist_ok=True)
-        return source_dir
+        return self._debian_dir / "source"
 
-    @property
+    @cached_property
     def _deb_version(self) -> str:
         v = f"{self._k8s_version.major}.{self._k8s_version.minor}.{self._k8s_version.micro}"
         if self._k8s_version.is_prerelease and len(self._k8s_version.pre) > 2:  # type: ignore
@@ -128,7 +173,7 @@ class K8sDebManager:
             v = f"{v}-{pre}"
         return f"{v}-{self._version_postfix}"
 
-    @property
+    @cached_property
     def _k8s_version(self) -> Version:
         try:
             k8s_version = Version(self._repo_tag)
@@ -136,7 +181,7 @@ class K8sDebManager:
             raise ValueError(f"Invalid version tag: {self._repo_tag}") from e
         return k8s_version
 
-    @property
+    @cached_property
     def _ppa_name(self) -> str:
         maj_min = f"{self._k8s_version.major}.{self._k8s_version.minor}"
         stable_ppa = f"{self._debs_lp_account}/v{maj_min}"
@@ -146,17 +191,14 @@ class K8sDebManager:
         LOG.info("Using test PPA: %s", stable_ppa)
         return f"{stable_ppa}-test"
 
-    def _create_changelog(self, ubuntu_codename: str) -> None:
+    def _create_changelog(self, ubuntu_codename: str, base: dict) -> None:
         """Create the changelog file."""
         changelog_path = self._debian_dir / "changelog"
-        changelog_tmpl = self._jinja_env.get_template("changelog.j2")
+        changelog_tmpl = self._templates["changelog.j2"]
         context = {
-            "component": self._component,
+            **base,
             "deb_version": self._deb_version,
             "ubuntu_codename": ubuntu_codename,
-            "full_name": self._debs_full_name,
-            "email": self._debs_email,
-            "date": datetime.now().astimezone().strftime("%a, %d %b %Y %H:%M:%S %z"),
         }
         with open(changelog_path, "w") as dst:
             dst.write(changelog_tmpl.render(context))
@@ -164,7 +206,7 @@ class K8sDebManager:
     def _create_control(self) -> None:
         """Create the control file."""
         control_path = self._debian_dir / "control"
-        control_tmpl = self._jinja_env.get_template("control.j2")
+        control_tmpl = self._templates["control.j2"]
         context = {
             "component": self._component,
             "section": "utils",
@@ -177,32 +219,20 @@ class K8sDebManager:
         with open(control_path, "w") as dst:
             dst.write(control_tmpl.render(context))
 
-    def _create_copyright(self) -> None:
+    def _create_copyright(self, base: dict) -> None:
         """Create the copyright file."""
         copyright_path = self._debian_dir / "copyright"
-        copyright_tmpl = self._jinja_env.get_template("copyright.j2")
-        context = {
-            "component": self._component,
-            "full_name": self._debs_full_name,
-            "email": self._debs_email,
-            "year": datetime.now().strftime("%Y"),
-        }
+        copyright_tmpl = self._templates["copyright.j2"]
         with open(copyright_path, "w") as dst:
-            dst.write(copyright_tmpl.render(context))
+            dst.write(copyright_tmpl.render(base))
 
-    def _create_docs(self) -> None:
+    def _create_docs(self, base: dict) -> None:
         """Create documentation files."""
         readme_filename = "README"
         readme_path = self._debian_dir / readme_filename
-        readme_tmpl = self._jinja_env.get_template("README.j2")
-        context = {
-            "component": self._component,
-            "full_name": self._debs_full_name,
-            "email": self._debs_email,
-            "date": datetime.now().astimezone().strftime("%a, %d %b %Y %H:%M:%S %z"),
-        }
+        readme_tmpl = self._templates["README.j2"]
         with open(readme_path, "w") as dst:
-            dst.write(readme_tmpl.render(context))
+            dst.write(readme_tmpl.render(base))
 
         docs_path = self._debian_dir / f"{self._component}-docs.docs"
         with open(docs_path, "w") as dst:
@@ -210,52 +240,56 @@ class K8sDebManager:
 
     def _create_rules(self) -> None:
         """Create the rules file."""
-        rules_path = self._debian_dir / "rules"
-        rules_tmpl = self._jinja_env.get_template("rules.j2")
-        with open(rules_path, "w") as dst:
-            dst.write(rules_tmpl.render())
+        shutil.copyfile(TEMPLATES_DIR / "rules.j2", self._debian_dir / "rules")
 
     def _create_source_format(self) -> None:
         """Create the source/format file."""
-        format_path = self._source_dir / "format"
-        format_tmpl = self._jinja_env.get_template("source_format.j2")
-        with open(format_path, "w") as dst:
-            dst.write(format_tmpl.render())
+        shutil.copyfile(TEMPLATES_DIR / "source_format.j2", self._source_dir / "format")
 
     def _create_source_options(self) -> None:
         """Create the source/options file."""
-        options_path = self._source_dir / "options"
-        options_tmpl = self._jinja_env.get_template("source_options.j2")
-        with open(options_path, "w") as dst:
-            dst.write(options_tmpl.render())
+        shutil.copyfile(
+            TEMPLATES_DIR / "source_options.j2", self._source_dir / "options"
+        )
 
     def _replace_makefile(self) -> None:
         """Replace the Makefile with a custom one."""
         makefile = self._repo_dir / "Makefile"
         orig_makefile = self._repo_dir / "Makefile.original"
 
-        if os.path.exists(orig_makefile):
+        if orig_makefile.exists():
             raise FileExistsError(f"Original Makefile already exists: {orig_makefile}")
 
-        os.rename(makefile, orig_makefile)
+        makefile.rename(orig_makefile)
 
         context = {
             "component": self._component,
         }
-        makefile_tmpl = self._jinja_env.get_template("Makefile.j2")
+        makefile_tmpl = self._templates["Makefile.j2"]
         with open(makefile, "w") as f:
             f.write(makefile_tmpl.render(context))
 
     def _create_debian_package_structure(self, ubuntu_codename: str):
         """Create the Debian package structure."""
+        # Creates the debian dir as well
+        self._source_dir.mkdir(parents=True, exist_ok=True)
+        # Context shared by the templates, all dated from the same instant
+        now = datetime.now().astimezone()
+        base = {
+            "component": self._component,
+            "full_name": self._debs_full_name,
+            "email": self._debs_email,
+            "date": now.strftime("%a, %d %b %Y %H:%M:%S %z"),
+            "year": str(now.year),
+        }
         LOG.info("Creating changelog file")
-        self._create_changelog(ubuntu_codename=ubuntu_codename)
+        self._create_changelog(ubuntu_codename=ubuntu_codename, base=base)
         LOG.info("Creating control file")
         self._create_control()
         LOG.info("Creating copyright file")
-        self._create_copyright()
+        self._create_copyright(base=base)
         LOG.info("Creating docs file")
-        self._create_docs()
+        self._create_docs(base=base)
         LOG.info("Creating rules file")
         self._create_rules()
         LOG.info("Creating source/format file")
@@ -266,58 +300,80 @@ class K8sDebManager:
         self._replace_makefile()
 
     def _extract_go_version(self) -> Version:
-        """Extract the Go version from the go.mod file."""
-        go_ver_path = self._repo_dir / ".go-version"
-        if not os.path.exists(go_ver_path):
-            raise FileNotFoundError(f".go-version file not found in {self._repo_dir}")
-
-        with open(go_ver_path, "r") as f:
-            return Version(f.read().strip())
+        """Extract the Go version from the .go-version file."""
+        try:
+            go_version = (self._repo_dir / ".go-version").read_text()
+        except FileNotFoundError as e:
+            raise FileNotFoundError(
+                f".go-version file not found in {self._repo_dir}"
+            ) from e
+        return Version(go_version.strip())
+
+    def _fetch_go_runtime(
+        self,
+        go_version: Version,
+        to: Union[str, Path],
+        cancelled: threading.Event | None = None,
+    ) -> str:
+        """Download the Go tarball and extract it while it is being streamed.
 
-    def _download_go_tar(self, go_version: Version, to: Union[str, Path]) -> str:
-        """Download the Go tarball for the specified version."""
+        Setting cancelled stops the extraction before the next archive member.
+        """
         tarball = f"go{go_version}.linux-amd64.tar.gz"
         url = f"https://go.dev/dl/{tarball}"
 
         try:
-            execute(["wget", "--progress=dot:giga", url], cwd=to, timeout=None)
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(
-                f"Failed to wget url: CODE: {e.returncode}\nSTDERR: {e.stderr}\nSTDOUT: {e.stdout}"
-            )
+            with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as r:
+                r.raise_for_status()
+                # Undo any transfer encoding, the tarball itself stays gzipped
+                r.raw.decode_content = True
+                with tarfile.open(fileobj=r.raw, mode="r|gz") as tar:
+                    for member in tar:
+                        if cancelled and cancelled.is_set():
+                            raise RuntimeError(f"Download of {tarball} cancelled")
+                        tar.extract(member, path=to, filter="tar")
+        except requests.RequestException as e:
+            raise RuntimeError(f"Failed to download url {url}: {e}") from e
+        except (tarfile.TarError, OSError) as e:
+            raise RuntimeError(f"Failed to extract tar file {tarball}: {e}") from e
 
         return tarball
 
-    def _extract_tar(self, path: Union[str, Path], wd: Union[str, Path]) -> None:
-        """Extract the tarball to the specified directory."""
-        try:
-            execute(["tar", "xf", str(path)], cwd=wd, timeout=None)
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(
-                f"Failed to extract tar file: CODE: {e.returncode}\nSTDERR: {e.stderr}\nSTDOUT: {e.stdout}"
-            )
+    def _prefetch_go_runtime(self, to: Path, cancelled: threading.Event) -> Version:
+        """Fetch the Go runtime of the tag without waiting for the repo clone."""
+        go_version = Version(read_file_at(K8S_REPO, self._repo_tag, ".go-version"))
+        LOG.info("Prefetching Go runtime version %s", go_version)
+        self._fetch_go_runtime(go_version, to=to, cancelled=cancelled)
+        return go_version
 
-    def _vendor_go_runtime(self):
+    def _vendor_go_runtime(self, prefetched: Future, prefetch_dir: Path):
         """Vendor the Go runtime into the Debian package."""
         go_version = self._extract_go_version()
+        try:
+            prefetched_version = prefetched.result()
+        except (requests.RequestException, RuntimeError, InvalidVersion) as e:
+            LOG.warning("Failed to prefetch the Go runtime: %s", e)
+            prefetched_version = None
+
+        if prefetched_version == go_version:
+            LOG.info("Using prefetched Go runtime version %s", go_version)
+            (prefetch_dir / "go").rename(self._debian_dir / "go")
+            return
+
+        # Drop what a failed or mismatched prefetch left behind
+        shutil.rmtree(prefetch_dir, ignore_errors=True)
+
         LOG.info("Downloading Go runtime version %s", go_version)
-        tarball = self._download_go_tar(go_version, to=self._debian_dir)
-        self._extract_tar(tarball, wd=self._debian_dir)
+        tarball = self._fetch_go_runtime(go_version, to=self._debian_dir)
         LOG.info("Extracted Go runtime tarball %s", tarball)
-        os.remove(self._debian_dir / tarball)
 
     def _build_source_package(self):
         """Build the source package using debuild."""
         try:
-            out, _ = execute(
-                ["debuild", "-S"],
-                cwd=self._repo_dir,
-                timeout=None,
-            )
-            LOG.info("debuild output: \n%s", out)
+            execute_streamed(["debuild", "-S"], cwd=self._repo_dir, log=LOG)
         except subprocess.CalledProcessError as e:
             raise RuntimeError(
-                f"Failed to build source package: CODE: {e.returncode}\nSTDERR: {e.stderr}\nSTDOUT: {e.stdout}"
+                f"Failed to build source package: CODE: {e.returncode}\nOUTPUT: {e.output}"
             )
 
     def _upload_to_ppa(self):
@@ -329,21 +385,20 @@ class K8sDebManager:
 
         LOG.info("Uploading changes file %s to %s", changes_file, self._ppa_name)
         try:
-            out, _ = execute(
+            execute_streamed(
                 ["dput", f"ppa:{self._ppa_name}", changes_file],
                 cwd=self._repo_dir.parent,
-                timeout=None,
+                log=LOG,
             )
-            LOG.info("dput output: \n%s", out)
         except subprocess.CalledProcessError as e:
             raise RuntimeError(
-                f"Failed to publish source package: CODE: {e.returncode}\nSTDERR: {e.stderr}\nSTDOUT: {e.stdout}"
+                f"Failed to publish source package: CODE: {e.returncode}\nOUTPUT: {e.output}"
             )
 
     def _configure_debuild(self):
         """Configure debuild with credentials and options"""
         devscripts_path = os.path.join(os.path.expanduser("~"), ".devscripts")
-        devscripts_tmpl = self._jinja_env.get_template("devscripts.j2")
+        devscripts_tmpl = self._templates["devscripts.j2"]
         context = {
             "gpg_key": self._debs_gpg_key.get_secret_value(),
         }
@@ -355,28 +410,41 @@ class K8sDebManager:
         """Build the Debian package."""
         ubuntu_codename = _get_ubuntu_codename()
         LOG.info("Got Ubuntu codename: %s", ubuntu_codename)
-        LOG.info("Cloning Kubernetes repo at branch %s", self._repo_tag)
-        with clone(
-            repo_url="https://github.com/kubernetes/kubernetes.git",
-            repo_tag=self._repo_tag,
-            shallow=True,
-            base_dir=build_dir,
-        ) as dir:
-            self._repo_dir = dir
-            LOG.info("Cloned Kubernetes repo in %s", self._repo_dir)
-            LOG.info("Creating Debian package structure...")
-            self._create_debian_package_structure(ubuntu_codename=ubuntu_codename)
-            LOG.info("Vendoring Go runtime...")
-            self._vendor_go_runtime()
-            LOG.info("Configuring debuild...")
-            self._configure_debuild()
-            LOG.info("Building source package...")
-            self._build_source_package()
-            LOG.info(
-                "Successfully built source package %s_%s",
-                self._component,
-                self._deb_version,
-            )
+        # The Go download does not need the clone, overlap the two
+        prefetch_dir = Path(build_dir) / "go-runtime"
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1)
+        prefetched = executor.submit(self._prefetch_go_runtime, prefetch_dir, cancelled)
+        try:
+            LOG.info("Cloning Kubernetes repo at branch %s", self._repo_tag)
+            with clone(
+                repo_url=K8S_REPO,
+                repo_tag=self._repo_tag,
+                shallow=True,
+                base_dir=build_dir,
+            ) as dir:
+                self._repo_dir = dir
+                LOG.info("Cloned Kubernetes repo in %s", self._repo_dir)
+                LOG.info("Creating Debian package structure...")
+                self._create_debian_package_structure(
+                    ubuntu_codename=ubuntu_codename
+                )
+                LOG.info("Vendoring Go runtime...")
+                self._vendor_go_runtime(prefetched, prefetch_dir)
+                LOG.info("Configuring debuild...")
+                self._configure_debuild()
+                LOG.info("Building source package...")
+                self._build_source_package()
+                LOG.info(
+                    "Successfully built source package %s_%s",
+                    self._component,
+                    self._deb_version,
+                )
+        finally:
+            # A failed build stops the prefetch instead of waiting for it
+            cancelled.set()
+            executor.shutdown(cancel_futures=True)
+            shutil.rmtree(prefetch_dir, ignore_errors=True)
 
     def _publish_deb(self):
         """Publish the Debian package to the PPA."""
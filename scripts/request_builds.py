@@ -3,8 +3,9 @@
 import argparse
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Generator, Iterable
+from typing import Container, Generator, Iterable
 
 import semver
 import util.lp as lp
@@ -15,6 +16,22 @@ USAGE = f"./{Path(__file__).name} [options]"
 
 DESCRIPTION = """Request all builds with launchpad recipes"""
 
+# Maximum number of tip branches cloned concurrently
+MAX_PARALLEL_CLONES = 4
+
+
+def read_branch(branch: str) -> tuple[str, semver.Version, list[str]]:
+    """Clone a tip branch and read its Kubernetes version and flavours."""
+    LOG.info("Cloning tip branch %s", branch)
+    # Only the version file is read, the flavours are listed from the tree
+    sparse = ["build-scripts/components/kubernetes"]
+    with repo.clone(util.SNAP_REPO, branch, sparse=sparse) as dir:
+        version_file = dir / "build-scripts/components/kubernetes/version"
+        branch_ver = version_file.read_text().strip()
+        ver = semver.Version.parse(branch_ver.strip("v"))
+        LOG.info("  Kubernetes version detected %s on %s", branch_ver, branch)
+        return branch, ver, util.flavors(dir)
+
 
 def rebuild_branches(branches: Iterable[str], args: argparse.Namespace):
     """Prepares all flavour branches to be built.
@@ -24,20 +41,12 @@ def rebuild_branches(branches: Iterable[str], args: argparse.Namespace):
     * Ensure LP recipes are building from correct branches.
     * Ensure LP recipes are pushing to the correct snap channels.
     """
-    client = lp.client()
-    owner = client.people[lp.OWNER]
-    for branch in branches:
-        LOG.info("Cloning tip branch %s", branch)
-        with repo.clone(util.SNAP_REPO, branch) as dir:
-            version_file = dir / "build-scripts/components/kubernetes/version"
-            branch_ver = version_file.read_text().strip()
-            ver = semver.Version.parse(branch_ver.strip("v"))
-            flavors = util.flavors(dir)
-
-            LOG.info("  Kubernetes version detected %s", branch_ver)
+    owner = lp.person(lp.OWNER)
+    # The branches are cloned concurrently, but launchpadlib is not
+    # thread-safe so the recipes are still handled one branch at a time
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_CLONES) as executor:
+        for branch, ver, flavors in executor.map(read_branch, branches):
             tip = branch == "main"
-
-            flavors = util.flavors(dir)
             for flavor in flavors:
                 recipe_name = util.recipe_name(flavor, ver, tip)
                 LOG.info("  Searching for recipe %s", recipe_name)
@@ -54,7 +63,9 @@ def rebuild_branches(branches: Iterable[str], args: argparse.Namespace):
                         )
 
 
-def tip_branches(branches: Iterable[str]) -> Generator[str, None, None]:
+def tip_branches(
+    branches: Iterable[str], remote_branches: Container[str]
+) -> Generator[str, None, None]:
     for branch in branches:
         if not util.TIP_BRANCH.match(branch):
             LOG.warning(
@@ -63,7 +74,7 @@ def tip_branches(branches: Iterable[str]) -> Generator[str, None, None]:
                 util.TIP_BRANCH.pattern,
             )
             continue
-        if not repo.is_branch(util.SNAP_REPO, branch):
+        if branch not in remote_branches:
             LOG.error("Branch %s does not exist", branch)
             continue
         yield branch
@@ -79,10 +90,16 @@ def main():
     args = util.setup_arguments(arg_parser)
     branches = args.branches
 
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Log in to Launchpad while the branches are being listed
+        login = executor.submit(lp.client)
+        # A single ls-remote lists the branches to check the requested ones against
+        remote_branches = list(repo.ls_branches(util.SNAP_REPO))
+        login.result()
     if not branches:
-        branches = repo.ls_branches(util.SNAP_REPO)
+        branches = remote_branches
         LOG.info("No branches specified, checking all branches")
-    rebuild_branches(tip_branches(branches), args)
+    rebuild_branches(tip_branches(branches, set(remote_branches)), args)
 
 
 is_main = __name__ == "__main__"
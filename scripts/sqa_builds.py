@@ -9,6 +9,8 @@ import argparse
 import logging
 import random
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from pydantic import BaseModel
 from requests.exceptions import HTTPError
@@ -17,16 +19,28 @@ from util import charmhub, k8s, sqa, util
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
 
+# Maximum number of tracks for which builds are created concurrently
+MAX_PARALLEL_TRACKS = 8
+
+# Addon id of the builds, k8s-build-<revision>-<arch>-<base>-<track>-<risk>
+BUILD_ADDON_RE = re.compile(r"^k8s-build-(\d+)-([^-]+)-([^-]+)-([^-]+)-([^-]+)$")
+
+# Guards the builds of the state shared by the tracks
+_state_lock = threading.Lock()
+
 class State(BaseModel):
     builds: dict[str, sqa.Build]
 
 def get_state() -> State:
-    pattern = re.compile(r"^k8s-build-(\d+)-([^-]+)-([^-]+)-([^-]+)-([^-]+)$")
+    statuses = ["Queued", "Running", "Finished"]
+    # Each status is a separate weebl-tools query, run them side by side
+    with ThreadPoolExecutor(max_workers=len(statuses)) as executor:
+        builds_by_status = list(executor.map(sqa.list_builds, statuses))
 
     builds: dict[str, sqa.Build] = {}
-    for status in ["Queued", "Running", "Finished"]:
-        for build in sqa.list_builds(status=status):
-            match = pattern.match(build.addon_id)
+    for status_builds in builds_by_status:
+        for build in status_builds:
+            match = BUILD_ADDON_RE.match(build.addon_id)
             if not match:
                 continue
             revision, arch, base, track, risk = match.groups()
@@ -40,64 +54,85 @@ def get_results(state: State) -> str:
     """Get the results of the builds for a specific track."""
 
     log.info("Getting results from previous test runs...")
-    results: list[str] = []
 
     if not state:
         log.info("No state found, returning empty results.")
         return ""
 
-    for revision, details in state.builds.items():
-        results.append(f"Revision: {revision}, Status: {details.status}, Result: {details.result}, UUID: {details.uuid}, Arch: {details.arch}, Base: {details.base}, Channel: {details.channel}")
+    return "\n".join(
+        f"Revision: {revision}, Status: {details.status}, Result: {details.result}, UUID: {details.uuid}, Arch: {details.arch}, Base: {details.base}, Channel: {details.channel}"
+        for revision, details in state.builds.items()
+    )
 
-    return "\n".join(results)
 
+def _fetch_revision_matrix(charm: str, channel: str) -> charmhub.RevisionMatrix | None:
+    """Get the revision matrix of a charm channel, or None if it has no revisions."""
+    log.info(f"Getting revisions for {charm} charm on channel {channel}")
+    try:
+        revision_matrix = charmhub.get_revision_matrix(charm, channel)
+    except HTTPError:
+        log.exception(
+            f"failed to get revision matrix for charm {charm} channel {channel}"
+        )
+        return None
 
-def create_one_build(
-    state: State, track: str, risk_level: str, arch: str, base: str, dry_run: bool
-):
-    """Process the given channel based on its current state."""
-    log.info(f"Current state: {state}")
-    channel = f"{track}/{risk_level}"
-    k8s_operator_bundle = charmhub.Bundle("k8s-operator")
-    for charm in ["k8s", "k8s-worker"]:
-        log.info(f"Getting revisions for {charm} charm on channel {channel}")
-        try:
-            revision_matrix = charmhub.get_revision_matrix(charm, channel)
-        except HTTPError:
-            log.exception(
-                f"failed to get revision matrix for charm {charm} channel {channel}"
-            )
-            return
+    if not revision_matrix:
+        log.exception(f"charm {charm} has no revisions on channel {channel}")
+        return None
 
-        if not revision_matrix:
-            log.exception(f"charm {charm} has no revisions on channel {channel}")
-            return
+    log.info(
+        f"Revision matrix for {charm} on channel {channel} \n: {revision_matrix}"
+    )
+    return revision_matrix
 
-        log.info(
-            f"Revision matrix for {charm} on channel {channel} \n: {revision_matrix}"
-        )
-        k8s_operator_bundle.set(charm, revision_matrix)
 
-    k8s_revision_matrix = k8s_operator_bundle.get("k8s")
+def _testable_revisions(
+    state: State, revision_matrix: charmhub.RevisionMatrix, arch: str, base: str
+) -> list[tuple[str, str]]:
+    """Return the (base, arch) pairs matching the constraints and not yet tested."""
     testable_revisions = []
-    for matrix_base in k8s_revision_matrix.get_bases():
-        for matrix_arch in k8s_revision_matrix.get_archs():
+    for matrix_base in revision_matrix.get_bases():
+        for matrix_arch in revision_matrix.get_archs():
             if arch and arch != matrix_arch:
                 continue
 
             if base and base != matrix_base:
                 continue
 
-            revision = k8s_revision_matrix.get(matrix_arch, matrix_base)
-            if revision and not state.builds.get(str(revision)):
+            revision = revision_matrix.get(matrix_arch, matrix_base)
+            with _state_lock:
+                tested = state.builds.get(str(revision))
+            if revision and not tested:
                 testable_revisions.append((matrix_base, matrix_arch))
+    return testable_revisions
 
+
+def create_one_build(
+    state: State, track: str, risk_level: str, arch: str, base: str, dry_run: bool
+):
+    """Process the given channel based on its current state."""
+    with _state_lock:
+        log.info(f"Current state: {state}")
+    channel = f"{track}/{risk_level}"
+
+    # The builds are named after the k8s revision, check it before anything else
+    if not (k8s_revision_matrix := _fetch_revision_matrix("k8s", channel)):
+        return
+
+    testable_revisions = _testable_revisions(state, k8s_revision_matrix, arch, base)
     if not testable_revisions:
         log.info(
             "The constraints resulted in no testable revisions or they are already tested. Skipping..."
         )
         return
 
+    if not (worker_revision_matrix := _fetch_revision_matrix("k8s-worker", channel)):
+        return
+
+    k8s_operator_bundle = charmhub.Bundle("k8s-operator")
+    k8s_operator_bundle.set("k8s", k8s_revision_matrix)
+    k8s_operator_bundle.set("k8s-worker", worker_revision_matrix)
+
     log.info(
         f"Found {len(testable_revisions)} testable revision(s) for channel {channel}: {testable_revisions}"
     )
@@ -122,7 +157,8 @@ def create_one_build(
         build.base = base_in_test
         build.arch = arch_in_test
         build.channel = channel
-        state.builds[revisions.get("k8s_revision")] = build
+        with _state_lock:
+            state.builds[revisions.get("k8s_revision")] = build
 
 
 def main():
@@ -161,15 +197,22 @@ def main():
 
     state = get_state()
 
-    for track in tracks:
-        create_one_build(
-            state,
-            track,
-            args.risk_level,
-            args.arch,
-            args.base,
-            args.dry_run,
-        )
+    # Each track is tested independently, only the state is shared
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_TRACKS) as executor:
+        futures = [
+            executor.submit(
+                create_one_build,
+                state,
+                track,
+                args.risk_level,
+                args.arch,
+                args.base,
+                args.dry_run,
+            )
+            for track in tracks
+        ]
+        for future in futures:
+            future.result()
 
     results = get_results(state)
     with open("results.txt", "w") as f:
@@ -2,16 +2,34 @@ import base64
 import json
 import logging
 import os
-import random
 import subprocess
-from collections import defaultdict
+import threading
+import time
+from concurrent.futures import Future
+from functools import cache
 
 import requests
+from requests.adapters import HTTPAdapter
 
 log = logging.getLogger(__name__)
 
 # Timeout for Store API request in seconds
 TIMEOUT = 10
+# Platforms a revision matrix is looked up for
+BASES = ["20.04", "22.04", "24.04", "26.04", "28.04", "30.04"]
+ARCHS = ["amd64", "arm64"]
+# Maximum number of idle connections kept to Charmhub
+POOL_MAXSIZE = 32
+# Number of seconds a revision matrix fetched from Charmhub is reused for
+REVISION_MATRIX_TTL = 300
+
+_revision_matrix_cache: dict[tuple[str, str], tuple[float, "RevisionMatrix"]] = {}
+_revision_matrix_inflight: dict[tuple[str, str], Future] = {}
+_revision_matrix_lock = threading.Lock()
+
+# Tracks query Charmhub from several threads, keep a connection for each
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_maxsize=POOL_MAXSIZE))
 
 
 class CharmcraftFailure(Exception):
@@ -26,26 +44,40 @@ class Bundle:
     """
 
     def __init__(self, name):
-        self.data: defaultdict[str, RevisionMatrix] = defaultdict(None)
+        self.data: dict[str, RevisionMatrix] = {}
         self.name = name
+        # Result of is_testable, until the next charm is set
+        self._testable: bool | None = None
+        self._sorted_charms: list[str] = []
+        self._key_names: dict[str, str] = {}
 
     def set(self, charm, revision_matrix):
         self.data[charm] = revision_matrix
+        self._testable = None
+        self._sorted_charms = sorted(self.data)
+        self._key_names[charm] = f"{charm.replace('-', '_')}_revision"
 
     def get(self, charm):
         return self.data[charm]
 
     def is_testable(self):
+        if self._testable is None:
+            self._testable = self._is_testable()
+        return self._testable
+
+    def _is_testable(self):
         if not len(self.data) or any(matrix is None for matrix in self.data.values()):
             return False
 
         # All the matrices in a bundle must have the same span of arch and bases
         # and have a revision values for each (arch, base) so that they can be
         # tested alongside each other.
-        item: RevisionMatrix = random.choice(list(self.data.values()))  # nosec
+        item: RevisionMatrix = next(iter(self.data.values()))
 
         bases = item.get_bases()
         archs = item.get_archs()
+        # The (arch, base) pairs with a revision, which every matrix must have
+        released = [key for key, revision in item.data.items() if revision]
 
         for revision_matrix in self.data.values():
             if (
@@ -54,44 +86,31 @@ class Bundle:
             ):
                 return False
 
-            for base in bases:
-                for arch in archs:
-                    if item.get(arch, base) and not revision_matrix.get(arch, base):
-                        return False
+            if not all(revision_matrix.data.get(key) for key in released):
+                return False
 
         return True
 
     def get_bases(self):
-        try:
-            item: RevisionMatrix = random.choice(list(self.data.values()))  # nosec
-            return item.get_bases()
-        except StopIteration:
-            return set()
+        item: RevisionMatrix | None = next(iter(self.data.values()), None)
+        return item.get_bases() if item is not None else frozenset()
 
     def get_archs(self):
-        try:
-            item: RevisionMatrix = random.choice(list(self.data.values()))  # nosec
-            return item.get_archs()
-        except StopIteration:
-            return set()
+        item: RevisionMatrix | None = next(iter(self.data.values()), None)
+        return item.get_archs() if item is not None else frozenset()
 
     def get_revisions(self, arch, base):
-        revisions = {}
-
-        for charm in self.data.keys():
-            revisions[f"{charm.replace('-', '_')}_revision"] = self.data[charm].get(
-                arch, base
-            )
-
-        return revisions
+        return {
+            self._key_names[charm]: revision_matrix.get(arch, base)
+            for charm, revision_matrix in self.data.items()
+        }
 
     def get_version(self, arch, base):
-        charms = sorted(self.data.keys())
-        if not charms:
+        if not self._sorted_charms:
             return None
 
         version = self.name
-        for charm in charms:
+        for charm in self._sorted_charms:
             revision_matrix = self.data[charm]
             if not revision_matrix:
                 return None
@@ -115,27 +134,45 @@ class RevisionMatrix:
     """
 
     def __init__(self):
-        self.data: defaultdict[tuple[str, str], str] = defaultdict(str)
+        self.data: dict[tuple[str, str], int] = {}
+        self._fingerprint: int | None = None
+        self._archs: frozenset[str] = frozenset()
+        self._bases: frozenset[str] = frozenset()
 
     def set(self, arch, base, revision):
-        self.data[(arch, base)] = revision
+        self.data[(arch, base)] = int(revision)
+        self._fingerprint = None
+        if arch not in self._archs:
+            self._archs |= {arch}
+        if base not in self._bases:
+            self._bases |= {base}
+
+    def fingerprint(self) -> int:
+        """Hash of the revisions, computed once until the matrix changes."""
+        if self._fingerprint is None:
+            self._fingerprint = hash(frozenset(self.data.items()))
+        return self._fingerprint
 
     def get_archs(self):
-        return set(k[0] for k in self.data.keys())
+        return self._archs
 
     def get_bases(self):
-        return set(k[1] for k in self.data.keys())
+        return self._bases
 
     def get(self, arch, base):
         return self.data.get((arch, base))
 
     def __eq__(self, other):
-        return dict(self.data) == dict(other.data)
+        if not isinstance(other, RevisionMatrix):
+            return NotImplemented
+        # Matrices with different fingerprints differ, skip the deep comparison
+        if self.fingerprint() != other.fingerprint():
+            return False
+        return self.data == other.data
 
     def __bool__(self):
-        if not self.data.keys():
-            return False
-        return all(value is not None for value in self.data.values())
+        # Revisions are always ints, a matrix is only empty when nothing is set
+        return bool(self.data)
 
     def __str__(self):
         archs = sorted(self.get_archs())
@@ -147,11 +184,13 @@ class RevisionMatrix:
         return "\n".join(result)
 
 
+@cache
 def get_charmhub_auth_macaroon() -> str:
     """Get the charmhub macaroon from the environment.
 
     This is used to authenticate with the charmhub API.
     Will raise a ValueError if CHARMCRAFT_AUTH is not set or the credentials are malformed.
+    The decoded macaroon is kept for the rest of the process.
     """
     # Auth credentials provided by "charmcraft login --export $outfile"
     creds_export_data = os.getenv("CHARMCRAFT_AUTH")
@@ -166,9 +205,18 @@ def get_charmhub_auth_macaroon() -> str:
     return v
 
 
-def find_revision(charm_name: str, channel: str, arch: str, base: str) -> int | None:
+def find_revisions(
+    charm_name: str, channel: str, platforms: list[tuple[str, str]]
+) -> dict[tuple[str, str], int | None]:
+    """Get the revisions of a charm channel for several (arch, base) at once.
+
+    A single refresh request carries one install action per platform, the
+    instance-key of each result tells which platform it answers. A client
+    error means no revision on any platform, like an empty channel, but a
+    server error raises an HTTPError rather than passing for one.
+    """
     log.info(
-        f"Querying Charmhub to get revisions of {charm_name=} {channel=} {arch=} {base=} ..."
+        f"Querying Charmhub to get revisions of {charm_name=} {channel=} {platforms=}"
     )
     url = "https://api.charmhub.io/v2/charms/refresh"
     headers = {"Content-Type": "application/json"}
@@ -179,28 +227,75 @@ def find_revision(charm_name: str, channel: str, arch: str, base: str) -> int |
                 "base": {"architecture": arch, "channel": base, "name": "ubuntu"},
                 "channel": channel,
                 "name": charm_name,
-                "instance-key": "query",
+                "instance-key": f"{arch}/{base}",
             }
+            for arch, base in platforms
         ],
         "context": [],
     }
-    r = requests.post(url, headers=headers, json=data, timeout=TIMEOUT)
-    return (
-        r.json()["results"][0]["charm"].get("revision")
-        if r.status_code == 200
-        else None
-    )
+    revisions: dict[tuple[str, str], int | None] = dict.fromkeys(platforms)
+    r = _session.post(url, headers=headers, json=data, timeout=TIMEOUT)
+    if 400 <= r.status_code < 500:
+        log.warning(f"No revisions of {charm_name=} {channel=}: {r.status_code}")
+        return revisions
+    r.raise_for_status()
+
+    for result in r.json()["results"]:
+        # Platforms without a release come back as errors, without a charm
+        arch, _, base = result["instance-key"].partition("/")
+        revisions[(arch, base)] = (result.get("charm") or {}).get("revision")
+    return revisions
+
+
+def clear_cache():
+    """Forget all the revision matrices cached from Charmhub."""
+    with _revision_matrix_lock:
+        _revision_matrix_cache.clear()
 
 
 def get_revision_matrix(charm_name: str, channel: str) -> RevisionMatrix:
-    """Get the revision of a charm in a channel."""
+    """Get the revision of a charm in a channel.
+
+    Results are cached for REVISION_MATRIX_TTL seconds and concurrent callers
+    asking for the same (charm, channel) share a single Charmhub query.
+    """
+    key = (charm_name, channel)
+    with _revision_matrix_lock:
+        cached = _revision_matrix_cache.get(key)
+        if cached and time.monotonic() - cached[0] < REVISION_MATRIX_TTL:
+            return cached[1]
+        future = _revision_matrix_inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _revision_matrix_inflight[key] = Future()
+
+    if not owner:
+        return future.result()
+
+    try:
+        revision_matrix = _query_revision_matrix(charm_name, channel)
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(revision_matrix)
+        with _revision_matrix_lock:
+            _revision_matrix_cache[key] = (time.monotonic(), revision_matrix)
+        return revision_matrix
+    finally:
+        with _revision_matrix_lock:
+            _revision_matrix_inflight.pop(key, None)
+
+
+def _query_revision_matrix(charm_name: str, channel: str) -> RevisionMatrix:
     log.info(f"Querying Charmhub to get revisions of {charm_name} in {channel}...")
 
     revision_matrix = RevisionMatrix()
-    for base in ["20.04", "22.04", "24.04", "26.04", "28.04", "30.04"]:
-        for arch in ["amd64", "arm64"]:
-            if revision := find_revision(charm_name, channel, arch, base):
-                revision_matrix.set(arch, base, revision)
+    platforms = [(arch, base) for base in BASES for arch in ARCHS]
+    revisions = find_revisions(charm_name, channel, platforms)
+    for (arch, base), revision in revisions.items():
+        if revision:
+            revision_matrix.set(arch, base, revision)
 
     return revision_matrix
 
@@ -224,3 +319,7 @@ def promote_charm(charm_name, from_channel, to_channel):
         )
     except subprocess.CalledProcessError as e:
         raise CharmcraftFailure(f"promote charm failed: {e.stderr}")
+
+    # The revisions published on the target channel have just changed.
+    with _revision_matrix_lock:
+        _revision_matrix_cache.pop((charm_name, to_channel), None)
@@ -1,3 +1,4 @@
+import functools
 import json
 import re
 from typing import Dict, List
@@ -6,11 +7,15 @@ import requests
 from packaging.version import InvalidVersion, Version
 
 K8S_TAGS_URL = "https://api.github.com/repos/kubernetes/kubernetes/tags"
+VERSION_RE = re.compile(r"^v?(\d+)\.(\d+)\..+")
+
+_session = requests.Session()
+_session.headers.update({"Accept": "application/vnd.github+json"})
 
 
 def _url_get(url: str) -> str:
     """Make a GET request to the given URL and return the response text."""
-    response = requests.get(url, timeout=5)
+    response = _session.get(url, timeout=5)
     response.raise_for_status()
     return response.text
 
@@ -27,22 +32,60 @@ def is_stable_release(release: str) -> bool:
     return "-" not in release
 
 
+@functools.cache
+def _k8s_releases() -> tuple[tuple[Version, str], ...]:
+    """Retrieve the (version, tag) of each release, newest first.
+
+    Each tag is parsed once here so that callers needing the version do not
+    parse it again.
+    """
+    response = _url_get(K8S_TAGS_URL)
+    tags_json = json.loads(response)
+    if not tags_json:
+        raise ValueError("No k8s tags retrieved.")
+    releases = [(Version(tag["name"]), tag["name"]) for tag in tags_json]
+    releases.sort(key=lambda release: release[0], reverse=True)
+    return tuple(releases)
+
+
 def get_k8s_tags() -> List[str]:
     """Retrieve semantically ordered Kubernetes release tags from GitHub.
 
+    The tags are only retrieved once per process.
+
     Returns:
         A list of release tag strings sorted from newest to oldest.
 
     Raises:
         ValueError: If no tags are retrieved.
     """
-    response = _url_get(K8S_TAGS_URL)
-    tags_json = json.loads(response)
-    if not tags_json:
-        raise ValueError("No k8s tags retrieved.")
-    tag_names = [tag["name"] for tag in tags_json]
-    tag_names.sort(key=lambda x: Version(x), reverse=True)
-    return tag_names
+    return [tag for _, tag in _k8s_releases()]
+
+
+def clear_cache():
+    """Forget the Kubernetes release tags retrieved from GitHub."""
+    _k8s_releases.cache_clear()
+    _scan_tags.cache_clear()
+
+
+@functools.cache
+def _scan_tags() -> tuple[str | None, Dict[str, str]]:
+    """Find the latest stable tag and the latest tag of each minor in one pass."""
+    latest_stable = None
+    latest_by_minor: Dict[str, str] = {}
+
+    for _, tag in _k8s_releases():
+        if latest_stable is None and is_stable_release(tag):
+            latest_stable = tag
+        match = VERSION_RE.match(tag)
+        if not match:
+            continue
+        major, minor = match.groups()
+        key = f"{major}.{minor}"
+        if key not in latest_by_minor:
+            latest_by_minor[key] = tag
+
+    return latest_stable, latest_by_minor
 
 
 def get_latest_stable() -> str:
@@ -54,10 +97,10 @@ def get_latest_stable() -> str:
     Raises:
         ValueError: If no stable release is found.
     """
-    for tag in get_k8s_tags():
-        if is_stable_release(tag):
-            return tag
-    raise ValueError("Couldn't find a stable release.")
+    latest_stable, _ = _scan_tags()
+    if latest_stable is None:
+        raise ValueError("Couldn't find a stable release.")
+    return latest_stable
 
 
 def get_latest_releases_by_minor() -> Dict[str, str]:
@@ -67,19 +110,8 @@ def get_latest_releases_by_minor() -> Dict[str, str]:
         A dictionary mapping minor versions (e.g. '1.30') to the
         latest (pre-)release tag (e.g. 'v1.30.1').
     """
-    latest_by_minor: Dict[str, str] = {}
-    version_regex = re.compile(r"^v?(\d+)\.(\d+)\..+")
-
-    for tag in get_k8s_tags():
-        match = version_regex.match(tag)
-        if not match:
-            continue
-        major, minor = match.groups()
-        key = f"{major}.{minor}"
-        if key not in latest_by_minor:
-            latest_by_minor[key] = tag
-
-    return latest_by_minor
+    _, latest_by_minor = _scan_tags()
+    return dict(latest_by_minor)
 
 
 def get_all_releases_after(release) -> set[str]:
@@ -93,13 +125,9 @@ def get_all_releases_after(release) -> set[str]:
     except InvalidVersion:
         raise ValueError(f"{release} is not a valid version")
 
-    for tag in get_k8s_tags():
+    for version, tag in _k8s_releases():
         if not is_stable_release(tag):
             continue
-        try:
-            version = Version(tag)
-        except InvalidVersion:
-            continue
 
         if version.major < least_version.major:
             continue
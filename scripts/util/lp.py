@@ -39,6 +39,24 @@ def client():
         raise ValueError("No launchpad credentials found")
 
 
+@cache
+def person(name: str):
+    """Return the Launchpad person or team with the given name."""
+    return client().people[name]
+
+
+@cache
+def project(name: str):
+    """Return the Launchpad project with the given name."""
+    return client().projects[name]
+
+
+@cache
+def default_repo(project_name: str):
+    """Return the default git repository of a Launchpad project."""
+    return client().git_repositories.getDefaultRepository(target=project(project_name))
+
+
 def snap_recipe(owner: PersonSet, name: str):
     """Return the recipe object for a given owner and name."""
     lp_client = client()
@@ -49,19 +67,35 @@ def snap_recipe(owner: PersonSet, name: str):
         return None
 
 
-def snap_by_owner(snap: str):
-    """Return the owner object for a given owner name."""
-    lp_client = client()
-    return lp_client.snaps.findByStoreName(
-        owner=lp_client.people[OWNER], store_name=snap
-    )
+@cache
+def snap_by_owner(snap: str) -> tuple:
+    """Return the recipes of the owner publishing the given snap.
 
+    Walking the collection pages through every recipe, so it is only done
+    once per process.
+    """
+    return tuple(client().snaps.findByStoreName(owner=person(OWNER), store_name=snap))
 
-def branch_from_track(snap, track):
-    """Return the branch name for a given track."""
+
+@cache
+def _track_branches(snap: str) -> dict[str, str]:
+    """Map each track of the snap to the branch of the first recipe feeding it."""
+    branches: dict[str, str] = {}
     for recipe in snap_by_owner(snap):
-        if any(chan.split("/")[0] == track for chan in recipe.store_channels):
-            return recipe.git_ref_link.split("+ref/")[1]
+        if not recipe.git_ref_link:
+            continue
+        branch = recipe.git_ref_link.split("+ref/")[1]
+        for chan in recipe.store_channels:
+            branches.setdefault(chan.split("/")[0], branch)
+    return branches
+
+
+def branch_from_track(snap, track):
+    """Return the branch name for a given track.
+
+    The recipes are walked once per snap, every track is then a lookup.
+    """
+    return _track_branches(snap).get(track)
 
 
 LOG = logging.getLogger(__name__)
@@ -1,13 +1,27 @@
 import contextlib
 import logging
 import os
+import re
 import subprocess
 import tempfile
 from pathlib import Path
 from typing import Any, Dict, Generator
+from urllib.parse import quote
+
+import requests
 
 LOG = logging.getLogger(__name__)
 
+GITHUB_REPO = re.compile(
+    r"^https://github\.com/(?P<owner>[^/]+)/(?P<name>[^/]+?)(?:\.git)?/?$"
+)
+GITHUB_RAW_URL = "https://raw.githubusercontent.com/{repo}/{ref}/{path}"
+GITHUB_TREE_URL = "https://api.github.com/repos/{repo}/git/trees/{ref}:{path}"
+# Timeout for GitHub requests in seconds
+TIMEOUT = 10
+
+_session = requests.Session()
+
 
 def _parse_output(*args, **kwargs) -> str:
     return subprocess.check_output(*args, text=True, **kwargs).strip()
@@ -19,10 +33,15 @@ def clone(
     repo_tag: str | None = None,
     shallow: bool = True,
     base_dir: str | None = None,
+    sparse: list[str] | None = None,
 ) -> Generator[Path, Any, Any]:
     """
     Clone a git repository on a temporary directory and return the directory.
 
+    If sparse paths are given, only the files below those directories are
+    checked out and no other file contents are downloaded. The whole tree
+    can still be listed with ls_tree.
+
     Example usage:
 
     ```
@@ -36,12 +55,28 @@ def clone(
         if repo_tag:
             cmd.extend(["-b", repo_tag])
         if shallow:
-            cmd.extend(["--depth", "1"])
+            # --depth implies --single-branch, skip the tags of other commits too
+            cmd.extend(["--depth", "1", "--no-tags"])
+        if sparse:
+            cmd.extend(["--filter=blob:none", "--sparse"])
         LOG.info("Cloning %s @ %s (shallow=%s)", repo_url, repo_tag, shallow)
         _parse_output(cmd)
+        if sparse:
+            _parse_output(["git", "sparse-checkout", "set", *sparse], cwd=tmpdir)
         yield Path(tmpdir)
 
 
+def has_path(repo_url: str, repo_tag: str, path: str) -> bool:
+    """Check whether a path exists at the given ref without checking out files.
+
+    Only the commit and its trees are downloaded, no file contents.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cmd = ["git", "clone", "--depth", "1", "--filter=blob:none", "--no-checkout"]
+        _parse_output(cmd + ["-b", repo_tag, repo_url, tmpdir])
+        return bool(ls_tree(tmpdir, path))
+
+
 def is_branch(repo: str, branch_name: str) -> bool:
     commits = _commit_sha1_per_branch(repo, branch_name)
     return f"refs/heads/{branch_name}" in commits
@@ -74,14 +109,49 @@ def ls_branches(repo: str) -> Generator[str, None, None]:
 
 
 def ls_tree(dir: os.PathLike, patch_dir: None | os.PathLike = None) -> list[str]:
+    # NUL separated names are neither quoted nor need stripping
+    cmd = ["git", "ls-tree", "--full-tree", "-r", "--name-only", "-z", "HEAD"]
+    out = subprocess.check_output(
+        cmd + ([patch_dir] if patch_dir else []), text=True, cwd=dir
+    )
+    # The output ends with a NUL, the last split is always empty
+    return sorted(out.split("\0")[:-1])
+
+
+def github_repo(repo_url: str) -> str | None:
+    """Return the "owner/name" of a GitHub repository url, None otherwise."""
+    if match := GITHUB_REPO.match(repo_url):
+        return f"{match['owner']}/{match['name']}"
+    return None
+
+
+def read_file_at(repo_url: str, ref: str, path: str) -> str:
+    """Read a file of a GitHub repository at the given ref without cloning it."""
+    if not (gh_repo := github_repo(repo_url)):
+        raise ValueError(f"Not a GitHub repository: {repo_url}")
+    url = GITHUB_RAW_URL.format(repo=gh_repo, ref=ref, path=path)
+    response = _session.get(url, timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.text
+
+
+def list_dir_at(repo_url: str, ref: str, path: str) -> list[str]:
+    """List the files below a directory of a GitHub repository at the given ref.
+
+    The paths are relative to the repository root, as listed by ls_tree.
+    """
+    if not (gh_repo := github_repo(repo_url)):
+        raise ValueError(f"Not a GitHub repository: {repo_url}")
+    # Branches such as autoupdate/v1.33.0-alpha contain slashes
+    url = GITHUB_TREE_URL.format(repo=gh_repo, ref=quote(ref, safe=""), path=path)
+    headers = {"Accept": "application/vnd.github+json"}
+    response = _session.get(
+        url, params={"recursive": 1}, headers=headers, timeout=TIMEOUT
+    )
+    response.raise_for_status()
+    tree = response.json()
+    if tree.get("truncated"):
+        raise ValueError(f"Tree of {path} at {ref} is too large to be listed")
     return sorted(
-        subprocess.check_output(
-            ["git", "ls-tree", "--full-tree", "-r", "--name-only", "HEAD"] + [patch_dir]
-            if patch_dir
-            else [],
-            text=True,
-            cwd=dir,
-        )
-        .strip()
-        .splitlines()
+        f"{path}/{entry['path']}" for entry in tree["tree"] if entry["type"] == "blob"
     )
@@ -2,6 +2,8 @@ import json
 import logging
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from . import charmhub
 
@@ -16,9 +18,24 @@ HEADERS = {
 # Timeout for Store API request in seconds
 TIMEOUT = 10
 
+# Transient Store errors are retried, the last response is still returned so
+# that raise_for_status reports it.
+_session = requests.Session()
+_session.mount(
+    "https://",
+    HTTPAdapter(
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            raise_on_status=False,
+        )
+    ),
+)
+
 
 def info(snap_name):
-    r = requests.get(INFO_URL + snap_name, headers=HEADERS, timeout=TIMEOUT)
+    r = _session.get(INFO_URL + snap_name, headers=HEADERS, timeout=TIMEOUT)
     r.raise_for_status()
     return json.loads(r.text)
 
@@ -54,5 +71,5 @@ def create_track(snap_name: str, track_name: str) -> None:
         "Content-Type": "application/json",
     }
     data = [{"name": track_name}]
-    r = requests.post(url, headers=headers, json=data, timeout=TIMEOUT)
+    r = _session.post(url, headers=headers, json=data, timeout=TIMEOUT)
     r.raise_for_status()
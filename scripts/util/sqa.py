@@ -6,9 +6,10 @@ import shlex
 import subprocess
 import tempfile
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from enum import StrEnum
 from pathlib import Path
-from typing import Optional
+from typing import NamedTuple, Optional
 from uuid import UUID
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
@@ -24,6 +25,13 @@ K8S_OPERATOR_PRODUCT_UUID = "432252b9-2041-4a9a-aece-37c2dbd54201"
 K8S_OPERATOR_TEST_PLAN_ID = "b171738f-96a4-42ab-bd91-b90e17b50c35"
 K8S_OPERATOR_TEST_PLAN_NAME = "CanonicalK8s"
 
+# Maximum number of weebl-tools commands run concurrently
+MAX_PARALLEL_COMMANDS = 8
+
+# Product versions already looked up or created, keyed by (channel, base, version)
+_product_versions_cache: dict[tuple[str, str, str], list["ProductVersion"]] = {}
+_product_versions_lock = threading.Lock()
+
 
 class InvalidSQAInput(Exception):
     pass
@@ -39,6 +47,12 @@ class BuildResult(StrEnum):
     UNKNOWN = "0"
 
 
+def clear_cache():
+    """Forget all the product versions cached from SQA."""
+    with _product_versions_lock:
+        _product_versions_cache.clear()
+
+
 def get_series(base: str) -> str | None:
     base_series_map = {
         "24.04": "noble",
@@ -199,6 +213,9 @@ def _create_product_version(channel: str, base: str, version: str) -> ProductVer
     if len(product_versions) > 1:
         raise SQAFailure("Too many product versions from create command")
 
+    with _product_versions_lock:
+        _product_versions_cache[(channel, base, version)] = product_versions
+
     return product_versions[0]
 
 
@@ -308,6 +325,13 @@ def _test_plan_instances(
 
 
 def _product_versions(channel, base, version) -> list[ProductVersion]:
+    # The same product versions are looked up when checking the state of a
+    # track and again when starting its release test, only ask SQA once.
+    key = (channel, base, version)
+    with _product_versions_lock:
+        if key in _product_versions_cache:
+            return _product_versions_cache[key]
+
     if not (series := get_series(base)):
         raise InvalidSQAInput("invalid base provided")
 
@@ -334,6 +358,9 @@ def _product_versions(channel, base, version) -> list[ProductVersion]:
     log.info(product_versions_response)
     product_versions = parse_response_lists(ProductVersion, product_versions_response)
 
+    with _product_versions_lock:
+        _product_versions_cache[key] = product_versions
+
     return product_versions
 
 
@@ -368,6 +395,27 @@ def start_release_test(channel, base, arch, revisions, version, priority):
     log.info(f"Started release test for {channel} with UUID: {test_plan_instance.uuid}")
 
 
+class ReleaseTest(NamedTuple):
+    """The arguments of a single start_release_test call."""
+
+    channel: str
+    base: str
+    arch: str
+    revisions: dict
+    version: str
+    priority: int
+
+
+def start_release_tests(release_tests: list[ReleaseTest]):
+    """Start all the given release tests in one go.
+
+    SQA offers no way to create several TPIs in a single request, so the
+    weebl-tools commands of each test are issued concurrently instead.
+    """
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_COMMANDS) as executor:
+        list(executor.map(lambda test: start_release_test(*test), release_tests))
+
+
 def _get_addon(name: str) -> Optional[Addon]:
     show_addon_cmd = f"addon show {name} --format json"
 
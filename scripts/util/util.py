@@ -2,6 +2,7 @@ import argparse
 import logging
 import re
 import subprocess
+from collections import deque
 from pathlib import Path
 from typing import List, Optional
 
@@ -17,11 +18,21 @@ TIP_BRANCH = re.compile(
 EXEC_TIMEOUT = 60
 
 
+PATCH_DIR = Path("build-scripts/patches")
+
+
 def flavors(dir: str) -> list[str]:
-    patch_dir = Path("build-scripts/patches")
-    output = repo.ls_tree(dir, patch_dir)
-    patches = set(Path(f).relative_to(patch_dir).parents[0] for f in output)
-    return sorted([p.name for p in patches] + ["classic"])
+    return flavors_from_patches(repo.ls_tree(dir, PATCH_DIR))
+
+
+def flavors_from_patches(patch_files: list[str]) -> list[str]:
+    prefix = f"{PATCH_DIR}/"
+    # The flavour is the name of the directory holding each patch
+    patches = {
+        f.removeprefix(prefix).rpartition("/")[0].rpartition("/")[2]
+        for f in patch_files
+    }
+    return sorted([*patches, "classic"])
 
 
 def recipe_name(flavor: str, ver: semver.Version, tip: bool) -> str:
@@ -68,6 +79,29 @@ def execute(
     return proc.stdout, proc.stderr
 
 
+def execute_streamed(
+    cmd: List[str], cwd=None, log: logging.Logger = LOG, tail: int = 50
+) -> None:
+    """Run the specified command, logging its combined output line by line.
+
+    Only the last `tail` lines are kept, as the output of the raised
+    CalledProcessError when the command fails.
+    """
+    log.debug("Executing: %s, cwd: %s.", cmd, cwd)
+    last_lines: deque[str] = deque(maxlen=tail)
+    with subprocess.Popen(
+        cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    ) as proc:
+        for line in proc.stdout:
+            line = line.rstrip("\n")
+            log.info(line)
+            last_lines.append(line)
+    if proc.returncode:
+        raise subprocess.CalledProcessError(
+            proc.returncode, cmd, output="\n".join(last_lines)
+        )
+
+
 def upstream_prerelease_to_snap_track(prerelease: str) -> str:
     prerelease_map = {
         "alpha": "edge",
@@ -0,0 +1,20 @@
+import pytest
+import util.charmhub as charmhub
+import util.k8s as k8s
+import util.sqa as sqa
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start and end every test without results cached by the util modules."""
+    caches = (
+        charmhub.clear_cache,
+        charmhub.get_charmhub_auth_macaroon.cache_clear,
+        k8s.clear_cache,
+        sqa.clear_cache,
+    )
+    for clear in caches:
+        clear()
+    yield
+    for clear in caches:
+        clear()
@@ -8,6 +8,8 @@ Scenarios:
 
 """
 
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from unittest.mock import MagicMock, patch
 
 import charm_release
@@ -52,6 +54,7 @@ def test_no_release_run(mock_sqa, mock_charmhub):
     mock_charmhub.get_revision_matrix.side_effect = get_revision_matrix_side_effect
     mock_charmhub.Bundle.return_value = charmhub.Bundle("k8s-operator")
     mock_sqa.TestPlanInstanceStatus = sqa.TestPlanInstanceStatus
+    mock_sqa.ReleaseTest = sqa.ReleaseTest
     mock_sqa.current_test_plan_instance_status.return_value = None
 
     priority_generator = sqa.PriorityGenerator()
@@ -62,10 +65,10 @@ def test_no_release_run(mock_sqa, mock_charmhub):
     mock_args.charms = ["k8s"]
     charm_release.process_track("1.32", priority_generator, mock_args)
 
-    mock_sqa.start_release_test.assert_called_once_with("1.32/candidate",
-                                                        "22.04", "amd64",
-                                                        {"k8s_revision": "741"},
-                                                        "k8s-operator-k8s-741", 1)
+    mock_sqa.start_release_tests.assert_called_once_with([
+        sqa.ReleaseTest("1.32/candidate", "22.04", "amd64", {"k8s_revision": 741},
+                        "k8s-operator-k8s-741", 1)
+    ])
     mock_charmhub.promote_charm.assert_not_called()
 
 
@@ -81,5 +84,86 @@ def test_no_new_release_no_action(mock_sqa, mock_charmhub):
     mock_args.dry_run = False
     mock_args.charms = ["k8s"]
     charm_release.process_track("1.32", priority_generator, mock_args)
-    mock_sqa.start_release_test.assert_not_called()
+    mock_sqa.start_release_tests.assert_not_called()
     mock_charmhub.promote_charm.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "states, failed, succeeded, in_progress",
+    [
+        ([], False, False, False),
+        (["Passed", "Passed"], False, True, False),
+        (["Passed", "In Progress"], False, False, True),
+        (["In Progress", "Failed", "Passed"], True, False, False),
+    ],
+)
+def test_track_state(states, failed, succeeded, in_progress):
+    track_state = charm_release.TrackState()
+    for idx, state in enumerate(states):
+        track_state.set_state(f"version-{idx}", sqa.TestPlanInstanceStatus(state))
+
+    assert track_state.failed == failed
+    assert track_state.succeeded == succeeded
+    assert track_state.in_progress == in_progress
+
+    track_state.set_state("version-failed", sqa.TestPlanInstanceStatus.FAILED)
+    assert track_state.failed, "Expected the cached state to be invalidated"
+
+
+
+class _RecordingExecutor(ThreadPoolExecutor):
+    """Executor keeping the futures of the submitted tracks, in order."""
+
+    futures: list[Future] = []
+
+    def submit(self, *args, **kwargs):
+        future = super().submit(*args, **kwargs)
+        self.futures.append(future)
+        return future
+
+
+@pytest.mark.parametrize("fail_fast", [True, False])
+def test_main_fail_fast(fail_fast, tmp_path, monkeypatch):
+    tracks = ["1.29", "1.30", "1.31", "1.32"]
+    processed = []
+
+    def process_track(track, priority_generator, args):
+        processed.append(track)
+        if track == "1.30":
+            return charm_release.ProcessState.PROCESS_FAILED
+        if track != "1.29":
+            # Leave time to cancel the tracks queued behind this one
+            time.sleep(0.2)
+        return charm_release.ProcessState.PROCESS_SUCCESS
+
+    argv = ["charm_release.py", "--supported-tracks", *tracks]
+    if fail_fast:
+        argv.append("--fail-fast")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("sys.argv", argv)
+    # A single worker processes the tracks in order
+    monkeypatch.setattr(charm_release, "MAX_PARALLEL_TRACKS", 1)
+    monkeypatch.setattr(_RecordingExecutor, "futures", [])
+    monkeypatch.setattr(charm_release, "ThreadPoolExecutor", _RecordingExecutor)
+    monkeypatch.setattr(charm_release, "process_track", process_track)
+
+    charm_release.main()
+
+    futures = dict(zip(tracks, _RecordingExecutor.futures))
+    results = (tmp_path / "results.txt").read_text().splitlines()
+    expected = [
+        f"{track}=process_{'failed' if track == '1.30' else 'success'}"
+        for track in tracks
+        if track in processed
+    ]
+    assert results == expected
+    assert results[:2] == ["1.29=process_success", "1.30=process_failed"]
+    if fail_fast:
+        # The worker may pick up 1.31 before it is cancelled, never 1.32
+        assert futures["1.32"].cancelled()
+        assert "1.32" not in processed
+        skipped = [track for track in tracks if track not in processed]
+        assert all(futures[track].cancelled() for track in skipped)
+    else:
+        assert processed == tracks
+        assert not any(future.cancelled() for future in futures.values())
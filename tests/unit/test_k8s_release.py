@@ -70,6 +70,7 @@ def test_get_obsolete_prereleases_starts_with_stable(mock_is_stable, mock_tags):
         ("v1.32.1-beta.3", "autoupdate/v1.32.1-beta"),
         ("v1.30.2-rc.1", "autoupdate/v1.30.2-rc"),
         ("v1.30.2-rc.1", "autoupdate/v1.30.2-rc"),
+        ("v1.30.10-rc.1", "autoupdate/v1.30.10-rc"),
     ],
 )
 def test_get_prereleases_git_branch_valid(tag, expected):
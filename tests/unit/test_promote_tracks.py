@@ -176,3 +176,47 @@ def test_new_stable():
         )[0],
     ]
     assert proposals == exp_proposals
+
+
+@mock.patch("promote_tracks.subprocess.run")
+def test_release_revision_batches_channels(mock_run):
+    release_args = argparse.Namespace(
+        dry_run=False,
+        snap_revision="123",
+        snap_channel=[f"{MOCK_TRACK}/beta", f"{MOCK_TRACK}/candidate"],
+    )
+    promote_tracks.release_revision(release_args)
+    mock_run.assert_called_once_with(
+        [
+            "/snap/bin/snapcraft",
+            "release",
+            "k8s",
+            "123",
+            f"{MOCK_TRACK}/beta,{MOCK_TRACK}/candidate",
+        ],
+        check=True,
+    )
+
+
+def test_build_upgrade_channels_skips_repeated_revisions():
+    prior_track = "1.30-tracky"
+    channels = {}
+    for track, risk, revision in [
+        (MOCK_TRACK, "edge", 3),
+        (MOCK_TRACK, "beta", 2),
+        (MOCK_TRACK, "stable", 2),
+        (prior_track, "stable", 1),
+    ]:
+        c = _create_channel(track, risk, revision)
+        channel_data = promote_tracks.ChannelMetadata.bake(**c.pop("channel"))
+        channels[channel_data.name] = promote_tracks.Channel.bake(
+            channel=channel_data, **c
+        )
+
+    upgrade_channels = promote_tracks._build_upgrade_channels(
+        channels[f"{MOCK_TRACK}/edge"], channels
+    )
+    assert upgrade_channels == [
+        [f"{MOCK_TRACK}/beta", f"{MOCK_TRACK}/edge"],
+        [f"{prior_track}/stable", f"{MOCK_TRACK}/edge"],
+    ]
@@ -0,0 +1,137 @@
+from unittest.mock import patch
+
+import pytest
+import requests
+import util.charmhub as charmhub
+
+
+def _all_revisions(revision):
+    return lambda charm, channel, platforms: dict.fromkeys(platforms, revision)
+
+
+@patch("util.charmhub.find_revisions", side_effect=_all_revisions(741))
+def test_get_revision_matrix_cached(mock_find_revisions):
+    first = charmhub.get_revision_matrix("k8s", "1.32/candidate")
+    calls = mock_find_revisions.call_count
+    second = charmhub.get_revision_matrix("k8s", "1.32/candidate")
+
+    assert first is second
+    assert first.get("amd64", "22.04") == 741
+    assert mock_find_revisions.call_count == calls, "Expected a cache hit"
+
+    charmhub.get_revision_matrix("k8s", "1.32/stable")
+    assert mock_find_revisions.call_count == 2 * calls, "Expected a cache miss"
+
+
+@patch("util.charmhub.find_revisions", side_effect=requests.HTTPError("boom"))
+def test_get_revision_matrix_error_not_cached(mock_find_revisions):
+    with pytest.raises(requests.HTTPError):
+        charmhub.get_revision_matrix("k8s", "1.32/candidate")
+    with pytest.raises(requests.HTTPError):
+        charmhub.get_revision_matrix("k8s", "1.32/candidate")
+    assert mock_find_revisions.call_count == 2
+
+
+@patch("util.charmhub.find_revisions", side_effect=_all_revisions(741))
+@patch("util.charmhub.subprocess.run")
+def test_promote_charm_invalidates_target(mock_run, mock_find_revisions):
+    charmhub.get_revision_matrix("k8s", "1.32/stable")
+    calls = mock_find_revisions.call_count
+
+    charmhub.promote_charm("k8s", "1.32/candidate", "1.32/stable")
+    charmhub.get_revision_matrix("k8s", "1.32/stable")
+    assert mock_find_revisions.call_count == 2 * calls
+
+
+def test_revision_matrix_eq():
+    matrix, other = charmhub.RevisionMatrix(), charmhub.RevisionMatrix()
+    matrix.set("amd64", "22.04", "741")
+    other.set("amd64", "22.04", "741")
+    assert matrix == other
+    assert matrix != {("amd64", "22.04"): "741"}
+
+    other.set("amd64", "22.04", "742")
+    assert matrix != other
+
+    other.set("amd64", "22.04", "741")
+    assert matrix == other
+
+
+@patch("util.charmhub._session.post")
+def test_find_revisions(mock_post):
+    mock_post.return_value.status_code = 200
+    mock_post.return_value.json.return_value = {
+        "results": [
+            {"instance-key": "amd64/22.04", "charm": {"revision": 741}},
+            {"instance-key": "arm64/22.04", "result": "error", "error": {}},
+        ]
+    }
+    platforms = [("amd64", "22.04"), ("arm64", "22.04")]
+    revisions = charmhub.find_revisions("k8s", "1.32/stable", platforms)
+
+    assert revisions == {("amd64", "22.04"): 741, ("arm64", "22.04"): None}
+    actions = mock_post.call_args.kwargs["json"]["actions"]
+    assert [action["instance-key"] for action in actions] == [
+        "amd64/22.04",
+        "arm64/22.04",
+    ]
+
+
+@patch("util.charmhub._session.post")
+def test_find_revisions_not_released(mock_post):
+    mock_post.return_value.status_code = 200
+    mock_post.return_value.json.return_value = {
+        "results": [
+            {
+                "instance-key": "amd64/24.04",
+                "result": "error",
+                "error": {"code": "revision-not-found"},
+            }
+        ]
+    }
+    revisions = charmhub.find_revisions("k8s", "1.32/stable", [("amd64", "24.04")])
+    assert revisions == {("amd64", "24.04"): None}
+
+
+@patch("util.charmhub._session.post")
+def test_find_revisions_http_error(mock_post):
+    mock_post.return_value.status_code = 503
+    mock_post.return_value.raise_for_status.side_effect = requests.HTTPError(
+        "Service Unavailable"
+    )
+    with pytest.raises(requests.HTTPError):
+        charmhub.find_revisions("k8s", "1.32/stable", [("amd64", "22.04")])
+    with pytest.raises(requests.HTTPError):
+        charmhub.get_revision_matrix("k8s", "1.32/stable")
+
+
+@patch("util.charmhub._session.post")
+def test_find_revisions_empty_channel(mock_post):
+    mock_post.return_value.status_code = 404
+    platforms = [("amd64", "22.04"), ("arm64", "22.04")]
+    revisions = charmhub.find_revisions("k8s", "1.33/stable", platforms)
+    assert revisions == dict.fromkeys(platforms)
+    mock_post.return_value.raise_for_status.assert_not_called()
+    assert not charmhub.get_revision_matrix("k8s", "1.33/stable")
+
+
+def test_bundle_is_testable():
+    k8s, worker = charmhub.RevisionMatrix(), charmhub.RevisionMatrix()
+    k8s.set("amd64", "22.04", "741")
+    worker.set("amd64", "24.04", "742")
+    bundle = charmhub.Bundle("k8s-operator")
+    bundle.set("k8s", k8s)
+    bundle.set("k8s-worker", worker)
+    assert k8s.get_archs() == {"amd64"} and worker.get_bases() == {"24.04"}
+    assert not bundle.is_testable()
+
+    worker = charmhub.RevisionMatrix()
+    worker.set("amd64", "22.04", "742")
+    bundle.set("k8s-worker", worker)
+    assert bundle.is_testable(), "Expected the result to follow the new charm"
+
+
+def test_empty_bundle():
+    bundle = charmhub.Bundle("k8s-operator")
+    assert not bundle.is_testable()
+    assert bundle.get_archs() == set() and bundle.get_bases() == set()
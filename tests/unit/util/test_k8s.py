@@ -2,8 +2,9 @@ import json
 from unittest.mock import patch
 
 import pytest
-from util.k8s import (get_k8s_tags, get_latest_releases_by_minor,
-                      get_latest_stable, is_stable_release)
+from util.k8s import (get_all_releases_after, get_k8s_tags,
+                      get_latest_releases_by_minor, get_latest_stable,
+                      is_stable_release)
 
 SAMPLE_TAGS = [
     {"name": "v1.33.0-alpha.0"},
@@ -29,6 +30,18 @@ def test_get_k8s_tags(mock_url_get):
     ]
 
 
+@patch("util.k8s._url_get")
+def test_get_k8s_tags_cached(mock_url_get):
+    mock_url_get.return_value = json.dumps(SAMPLE_TAGS)
+    tags = get_k8s_tags()
+    tags.clear()
+    assert get_k8s_tags()[0] == "v1.33.0-alpha.0"
+    assert get_latest_stable() == "v1.31.6"
+    get_latest_releases_by_minor().clear()
+    assert get_latest_releases_by_minor()["1.31"] == "v1.31.6"
+    mock_url_get.assert_called_once()
+
+
 @patch("util.k8s._url_get")
 def test_get_latest_stable(mock_url_get):
     mock_url_get.return_value = json.dumps(SAMPLE_TAGS)
@@ -49,6 +62,12 @@ def test_get_latest_releases_by_minor(mock_url_get):
     }
 
 
+@patch("util.k8s._url_get")
+def test_get_all_releases_after(mock_url_get):
+    mock_url_get.return_value = json.dumps(SAMPLE_TAGS)
+    assert get_all_releases_after("1.30") == {"1.30", "1.31"}
+
+
 @pytest.mark.parametrize(
     "tag,expected",
     [
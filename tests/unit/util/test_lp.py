@@ -8,6 +8,11 @@ import util.lp as lp
 @pytest.fixture(autouse=True)
 def clear_lp_client_cache():
     lp.client.cache_clear()
+    lp.person.cache_clear()
+    lp.project.cache_clear()
+    lp.default_repo.cache_clear()
+    lp.snap_by_owner.cache_clear()
+    lp._track_branches.cache_clear()
 
 
 @mock.patch("launchpadlib.launchpad.Launchpad.login_with")
@@ -51,3 +56,26 @@ def test_create_client_no_creds():
     with pytest.raises(ValueError, match="No launchpad credentials found"):
         lp.client()
     assert lp.client.cache_info().misses == 2, "Expected a cache miss"
+
+
+@mock.patch("util.lp.client")
+def test_default_repo_cached(mock_client):
+    repos = mock_client.return_value.git_repositories
+    assert lp.default_repo("k8s") is lp.default_repo("k8s")
+    repos.getDefaultRepository.assert_called_once_with(
+        target=mock_client.return_value.projects["k8s"]
+    )
+
+
+@mock.patch("util.lp.client")
+def test_branch_from_track(mock_client):
+    recipe = mock.MagicMock(
+        store_channels=["1.32-classic/edge"],
+        git_ref_link="~containers/k8s/+git/k8s/+ref/release-1.32",
+    )
+    mock_client.return_value.snaps.findByStoreName.return_value = iter([recipe])
+    assert lp.branch_from_track("k8s", "1.32-classic") == "release-1.32"
+    assert lp.branch_from_track("k8s", "1.32-classic") == "release-1.32"
+    mock_client.return_value.snaps.findByStoreName.assert_called_once()
+    assert lp.branch_from_track("k8s", "1.31-classic") is None
+    assert lp._track_branches.cache_info().hits == 2, "Expected a cache hit"
@@ -1,5 +1,8 @@
+import subprocess
 from pathlib import Path
+from unittest.mock import patch
 
+import pytest
 import util.repo as repo
 
 THIS_REPO = "https://github.com/canonical/canonical-kubernetes-release-ci.git"
@@ -31,3 +34,48 @@ def test_ls_tree():
     this_path = Path(__file__).parent
     paths = repo.ls_tree(this_path, "tests")
     assert paths, "Expected some paths"
+    assert "tests/unit/util/test_repo.py" in paths
+    assert set(paths) < set(repo.ls_tree(this_path)), "Expected the whole tree"
+
+
+def _commit(dir: Path, message: str):
+    git = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+    subprocess.run(git + ["commit", "--allow-empty", "-qm", message], cwd=dir, check=True)
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://github.com/canonical/k8s-snap.git/", "canonical/k8s-snap"),
+        ("https://github.com/canonical/k8s-snap", "canonical/k8s-snap"),
+        ("https://git.launchpad.net/k8s", None),
+    ],
+)
+def test_github_repo(url, expected):
+    assert repo.github_repo(url) == expected
+
+
+@patch("util.repo._session.get")
+def test_list_dir_at(mock_get):
+    mock_get.return_value.json.return_value = {
+        "truncated": False,
+        "tree": [
+            {"path": "moonray", "type": "tree"},
+            {"path": "moonray/0001.patch", "type": "blob"},
+        ],
+    }
+    paths = repo.list_dir_at(THIS_REPO, "release/1.32", "build-scripts/patches")
+    assert paths == ["build-scripts/patches/moonray/0001.patch"]
+    assert "release%2F1.32:build-scripts/patches" in mock_get.call_args.args[0]
+
+
+def test_has_path(tmp_path):
+    upstream = tmp_path / "upstream"
+    subprocess.run(["git", "init", "-qb", "main", str(upstream)], check=True)
+    (upstream / "tests").mkdir()
+    (upstream / "tests/test_it.py").write_text("")
+    subprocess.run(["git", "add", "."], cwd=upstream, check=True)
+    _commit(upstream, "first")
+
+    assert repo.has_path(upstream.as_uri(), "main", "tests/test_it.py")
+    assert not repo.has_path(upstream.as_uri(), "main", "tests/test_other.py")
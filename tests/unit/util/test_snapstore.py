@@ -8,9 +8,9 @@ import util.charmhub as charmhub
 import util.snapstore as snapstore
 
 
-@patch("util.snapstore.requests.get")
+@patch("util.snapstore._session.get")
 def test_info_success(mock_get):
-    # Mock the response from requests.get
+    # Mock the response from the session get
     mock_response = MagicMock()
     mock_response.status_code = 200
     mock_response.text = json.dumps({"name": "test-snap"})
@@ -25,7 +25,7 @@ def test_info_success(mock_get):
     )
 
 
-@patch("util.snapstore.requests.get")
+@patch("util.snapstore._session.get")
 def test_info_http_error(mock_get):
     # Mock an HTTPError
     mock_response = MagicMock()
@@ -36,7 +36,7 @@ def test_info_http_error(mock_get):
         snapstore.info("non-existent-snap")
 
 
-@patch("util.snapstore.requests.get")
+@patch("util.snapstore._session.get")
 def test_info_url_error(mock_get):
     # Mock a ConnectionError (similar to URLError in urllib)
     mock_get.side_effect = requests.ConnectionError("Failed to connect")
@@ -51,7 +51,7 @@ def test_ensure_track_create(mock_create_track):
     mock_create_track.assert_called_once_with("test-snap", "test-track")
 
 
-@patch("util.snapstore.requests.post")
+@patch("util.snapstore._session.post")
 @patch("util.charmhub.get_charmhub_auth_macaroon", return_value="mock-macaroon")
 def test_create_track(mock_get_auth, mock_post):
     mock_response = MagicMock()
@@ -79,6 +79,7 @@ def test_create_track(mock_get_auth, mock_post):
 def test_get_charmhub_auth_macaroon(mock_getenv):
     result = charmhub.get_charmhub_auth_macaroon()
     assert result == "mock-macaroon"
+    assert charmhub.get_charmhub_auth_macaroon() == "mock-macaroon"
     mock_getenv.assert_called_once_with("CHARMCRAFT_AUTH")
 
 
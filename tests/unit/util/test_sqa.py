@@ -32,6 +32,15 @@ def test_product_versions(mock_weebl_run):
     assert len(product_versions) == 2
 
 
+def test_product_versions_cached(mock_weebl_run):
+    with open("tests/unit/util/testdata/productversions.json", "r") as file:
+        mock_weebl_run.return_value = file.read()
+
+    args = ("1.32/candidate", "22.04", "k8s-operator-k8s-779-k8s-worker-776")
+    assert _product_versions(*args) == _product_versions(*args)
+    mock_weebl_run.assert_called_once()
+
+
 def test_create_test_plan_instance(mock_weebl_run):
     mock_test_plan_instances: str
 
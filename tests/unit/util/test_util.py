@@ -1,6 +1,9 @@
 import argparse
+import subprocess
+import sys
 import unittest.mock as mock
 
+import pytest
 import semver
 import util.util as util
 
@@ -9,6 +12,7 @@ import util.util as util
 def test_flavors(mock_ls_tree):
     mock_ls_tree.return_value = [
         "build-scripts/patches/flavor1/patch1",
+        "build-scripts/patches/flavor1/patch3",
         "build-scripts/patches/flavor2/patch2",
     ]
     expected = ["classic", "flavor1", "flavor2"]
@@ -51,3 +55,18 @@ def test_setup_logging(mock_logger):
     mock_args = argparse.Namespace(dry_run=False, loglevel="INFO")
     util.setup_logging(mock_args)
     mock_logger.root.setLevel.assert_called_once_with(level="INFO")
+
+
+def test_execute_streamed():
+    log = mock.MagicMock()
+    util.execute_streamed([sys.executable, "-c", "print('a'); print('b')"], log=log)
+    assert log.info.call_args_list == [mock.call("a"), mock.call("b")]
+    log.debug.assert_called_once()
+
+
+def test_execute_streamed_failure():
+    script = "import sys; print('a'); print('b'); sys.exit(3)"
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        util.execute_streamed([sys.executable, "-c", script], tail=1)
+    assert e.value.returncode == 3
+    assert e.value.output == "b"